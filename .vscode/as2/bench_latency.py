@@ -0,0 +1,101 @@
+"""Glass-to-detection latency for each capture profile.
+
+Point the camera at the "Latency Target" window (or fill the camera view
+with it) and run:
+
+    python bench_latency.py
+    python bench_latency.py --profiles low-latency driver-default --flashes 30 --model
+
+The target flips between black and white. For each flip we time how long it
+takes until a captured frame's brightness crosses the midpoint: that is the
+glass-to-frame latency of the capture configuration. With --model, each
+frame also goes through the pooled BGR->RGB conversion and hands.process(),
+so the number is glass-to-detection.
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from camera import CAPTURE_PROFILES, open_camera
+from framebuf import FramePool
+
+WINDOW = "Latency Target"
+
+
+def measure(profile, flashes, hands=None, timeout=2.0):
+    cap = open_camera(profile=profile)
+    if cap is None:
+        return None
+    pool = FramePool(flip=False)
+    black = np.zeros((720, 1280, 3), np.uint8)
+    white = np.full_like(black, 255)
+    latencies = []
+    try:
+        # Let exposure settle on both levels and find the midpoint
+        levels = []
+        for target in (black, white):
+            cv2.imshow(WINDOW, target)
+            cv2.waitKey(500)
+            for _ in range(10):
+                ok, frame, _ = pool.read(cap)
+            levels.append(float(frame.mean()))
+        midpoint = sum(levels) / 2
+        if abs(levels[1] - levels[0]) < 20:
+            print("⚠️  Camera cannot see the target window clearly; skipping")
+            return None
+
+        bright = True
+        for _ in range(flashes):
+            bright = not bright
+            cv2.imshow(WINDOW, white if bright else black)
+            cv2.waitKey(1)
+            shown = time.perf_counter()
+            while time.perf_counter() - shown < timeout:
+                ok, frame, rgb_frame = pool.read(cap)
+                if not ok:
+                    break
+                if hands is not None:
+                    hands.process(rgb_frame)
+                if (frame.mean() > midpoint) == bright:
+                    latencies.append(time.perf_counter() - shown)
+                    break
+            cv2.waitKey(100)
+    finally:
+        cap.release()
+    return latencies
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Glass-to-detection latency per capture profile")
+    parser.add_argument("--profiles", nargs="+", default=sorted(CAPTURE_PROFILES), choices=sorted(CAPTURE_PROFILES))
+    parser.add_argument("--flashes", type=int, default=20)
+    parser.add_argument("--model", action="store_true", help="include hands.process() in each frame")
+    args = parser.parse_args()
+
+    hands = None
+    if args.model:
+        import mediapipe as mp
+        hands = mp.solutions.hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    cv2.namedWindow(WINDOW, cv2.WINDOW_NORMAL)
+    results = {}
+    for profile in args.profiles:
+        print(f"\n🎥 {profile}")
+        latencies = measure(profile, args.flashes, hands)
+        if latencies:
+            results[profile] = latencies
+    cv2.destroyAllWindows()
+
+    print("\nprofile            median    p95    max  (ms, display latency included)")
+    for profile, latencies in results.items():
+        ordered = sorted(latencies)
+        p95 = ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))]
+        print(f"{profile:<17}{1000 * statistics.median(ordered):7.1f}{1000 * p95:7.1f}{1000 * ordered[-1]:7.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""Screenshot capture + encode timing per codec.
+
+    python bench_screencap.py                 # real screen (falls back to a synthetic one)
+    python bench_screencap.py --synthetic --runs 5
+
+The old path saved with PIL's default PNG settings (compress level 6); that is
+included as "png-6" for comparison. The last table compares full images with
+delta mode (delta.py) for a near-identical second capture.
+"""
+
+import argparse
+import statistics
+import time
+
+import cv2
+import numpy as np
+
+from delta import DeltaEncoder
+from screencap import ScreenCapturer, encode
+
+VARIANTS = [("png-6", "png", 6), ("png", "png", None), ("jpeg", "jpeg", None),
+            ("jpeg-75", "jpeg", 75), ("webp", "webp", None)]
+
+
+def synthetic_screen(width=1920, height=1080):
+    """Desktop-like image: flat panels, text-ish noise and a photo region"""
+    image = np.full((height, width, 3), 236, np.uint8)
+    cv2.rectangle(image, (0, 0), (width, 40), (60, 60, 60), -1)
+    rng = np.random.default_rng(0)
+    for y in range(80, height - 200, 22):
+        cv2.putText(image, "".join(rng.choice(list("abcdefghij klmnop")) for _ in range(90)),
+                    (40, y), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (30, 30, 30), 1, cv2.LINE_AA)
+    image[height - 180:height - 20, width - 420:width - 20] = rng.integers(0, 255, (160, 400, 3), np.uint8)
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--synthetic", action="store_true", help="skip the real screen grab")
+    args = parser.parse_args()
+
+    capturer = ScreenCapturer()
+    grab_times = []
+    image = None
+    if not args.synthetic:
+        try:
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                image = capturer.grab()
+                grab_times.append(time.perf_counter() - start)
+        except Exception as e:
+            print(f"Screen grab unavailable ({e}); using a synthetic screen")
+    if image is None:
+        image = synthetic_screen()
+    capture_ms = 1000 * statistics.median(grab_times) if grab_times else 0.0
+
+    print(f"{image.shape[1]}x{image.shape[0]}, capture {capture_ms:.1f} ms (median of {len(grab_times)})")
+    print(f"{'codec':<9}{'encode ms':>10}{'total ms':>10}{'KiB':>9}")
+    for name, codec, quality in VARIANTS:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            data, _ = encode(image, codec, quality)
+            times.append(time.perf_counter() - start)
+        encode_ms = 1000 * statistics.median(times)
+        print(f"{name:<9}{encode_ms:>10.1f}{capture_ms + encode_ms:>10.1f}{len(data) / 1024:>9.0f}")
+
+    # Second capture with a small change (a cursor-sized edit)
+    changed = image.copy()
+    cv2.rectangle(changed, (200, 200), (232, 232), (0, 0, 255), -1)
+    print(f"\n{'delta':<9}{'full ms':>10}{'delta ms':>10}{'full KiB':>10}{'delta KiB':>11}")
+    for codec in ("png", "jpeg"):
+        full_times, delta_times = [], []
+        for _ in range(args.runs):
+            encoder = DeltaEncoder(codec)
+            hashes, image_id, _, _ = encoder.prepare("peer", image)
+            encoder.delivered("peer", image_id, hashes)
+            start = time.perf_counter()
+            full, _ = encode(changed, codec)
+            full_times.append(time.perf_counter() - start)
+            start = time.perf_counter()
+            payload = encoder.prepare("peer", changed)[2]
+            delta_times.append(time.perf_counter() - start)
+        print(f"{codec:<9}{1000 * statistics.median(full_times):>10.1f}"
+              f"{1000 * statistics.median(delta_times):>10.1f}{len(full) / 1024:>10.0f}{len(payload) / 1024:>11.1f}")
+    capturer.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""Loopback cost of the secure transport (secure.py) against plain TCP.
+
+    python bench_secure.py
+    python bench_secure.py --mb 1024 --chunk-kb 64
+
+Measures connection setup (plain connect, full TLS handshake + pairing
+check, resumed TLS session) and bulk throughput, sending --mb MiB in
+--chunk-kb writes as the transports do. Uses a throwaway identity paired with
+itself, so ~/.airshare is not touched.
+
+The receiver runs in its own process, as it would on the partner's machine.
+On a single core, encryption, decryption and both copies share one CPU, so
+expect TLS to trail plain loopback by much more than on two machines.
+"""
+
+import argparse
+import multiprocessing
+import os
+import socket
+import statistics
+import struct
+import tempfile
+import time
+
+from secure import Identity, PeerStore, SecureChannel, open_connection, recv_exact
+
+
+def serve(tmp, secure, port_pipe, buffer_size=1024 * 1024):
+    """Accept forever; read a size, drain that many bytes and echo the count"""
+    channel = open_channel(tmp) if secure else None
+    listener = socket.create_server(("127.0.0.1", 0))
+    port_pipe.send(listener.getsockname()[1])
+    buffer = bytearray(buffer_size)
+    while True:
+        conn, _ = listener.accept()
+        if channel is not None:
+            conn = channel.accept(conn)
+        with conn:
+            (size,) = struct.unpack(">Q", recv_exact(conn, 8))
+            total = 0
+            while total < size:
+                n = conn.recv_into(buffer, min(buffer_size, size - total))
+                if not n:
+                    break
+                total += n
+            conn.sendall(struct.pack(">Q", total))
+
+
+def open_channel(tmp):
+    identity = Identity(os.path.join(tmp, "tls"))
+    peers = PeerStore(os.path.join(tmp, "peers.json"))
+    peers.pair("127.0.0.1", identity.fingerprint, identity.secret)
+    return SecureChannel(identity, peers)
+
+
+def start_server(tmp, secure):
+    parent, child = multiprocessing.Pipe()
+    multiprocessing.Process(target=serve, args=(tmp, secure, child), daemon=True).start()
+    return parent.recv()
+
+
+def connect_times(port, channel, runs):
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        with open_connection("127.0.0.1", port, 10, channel) as s:
+            times.append(time.perf_counter() - start)
+            s.sendall(struct.pack(">Q", 0))
+            recv_exact(s, 8)
+    return 1000 * statistics.median(times)
+
+
+def throughput(port, channel, total, chunk):
+    data = memoryview(os.urandom(chunk))
+    with open_connection("127.0.0.1", port, 30, channel) as s:
+        start = time.perf_counter()
+        s.sendall(struct.pack(">Q", total))
+        sent = 0
+        while sent < total:
+            s.sendall(data[:total - sent])
+            sent += min(len(data), total - sent)
+        (received,) = struct.unpack(">Q", recv_exact(s, 8))
+        seconds = time.perf_counter() - start
+    assert received == total
+    return total / seconds / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--mb", type=int, default=512, help="MiB per throughput run")
+    parser.add_argument("--chunk-kb", type=int, default=1024, help="size of each write")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tls = open_channel(tmp)
+        channels = {"plain": None, "tls": tls}
+        ports = {name: start_server(tmp, channel is not None) for name, channel in channels.items()}
+
+        print(f"{os.cpu_count()} CPU(s)")
+        print(f"connect        {connect_times(ports['plain'], None, 50):7.2f} ms")
+        full = []
+        for _ in range(20):
+            tls._tickets.clear()
+            full.append(connect_times(ports["tls"], tls, 1))
+        print(f"TLS full       {statistics.median(full):7.2f} ms")
+        print(f"TLS resumed    {connect_times(ports['tls'], tls, 50):7.2f} ms")
+
+        total, chunk = args.mb * 1024 * 1024, args.chunk_kb * 1024
+        rates = {name: max(throughput(ports[name], channel, total, chunk) for _ in range(args.runs))
+                 for name, channel in channels.items()}
+        for name, rate in rates.items():
+            print(f"{name:<15}{rate:7.0f} MB/s")
+        print(f"TLS / plain    {100 * rates['tls'] / rates['plain']:6.0f} %")
+
+
+if __name__ == "__main__":
+    main()
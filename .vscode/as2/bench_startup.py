@@ -0,0 +1,65 @@
+"""Startup benchmark for pic.py: time to first preview frame.
+
+    python bench_startup.py                # 5 runs with the preview window
+    python bench_startup.py --headless --runs 10 --json startup.json
+    python bench_startup.py --cold         # drop the camera cache before each run
+
+Each run starts a fresh interpreter with ``pic.py --startup-bench``, which
+exits after the first frame once the hand model has also finished loading.
+Needs a camera.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from camera import CACHE_PATH
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_once(headless, cold):
+    if cold and os.path.exists(CACHE_PATH):
+        os.remove(CACHE_PATH)
+    cmd = [sys.executable, os.path.join(HERE, "pic.py"), "--partner", "127.0.0.1", "--startup-bench"]
+    if headless:
+        cmd.append("--headless")
+    start = time.perf_counter()
+    proc = subprocess.run(cmd, cwd=HERE, capture_output=True, text=True, stdin=subprocess.DEVNULL)
+    wall = time.perf_counter() - start
+    for line in proc.stdout.splitlines():
+        if line.startswith("FIRST_FRAME"):
+            fields = line.split()
+            return {"first_frame": float(fields[1]), "model_ready": float(fields[3]), "process_wall": wall}
+    raise RuntimeError(f"pic.py did not report a first frame:\n{proc.stdout}\n{proc.stderr}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time-to-first-preview-frame benchmark for pic.py")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--headless", action="store_true")
+    parser.add_argument("--cold", action="store_true", help="remove the camera cache before each run")
+    parser.add_argument("--json", metavar="OUT", help="write the results to a JSON file")
+    args = parser.parse_args()
+
+    results = []
+    for i in range(args.runs):
+        r = run_once(args.headless, args.cold)
+        results.append(r)
+        print(f"run {i + 1}: first frame {1000 * r['first_frame']:6.0f} ms   "
+              f"model ready {1000 * r['model_ready']:6.0f} ms   process {1000 * r['process_wall']:6.0f} ms")
+
+    summary = {key: statistics.median(r[key] for r in results) for key in results[0]}
+    print(f"\n⏱️  median first frame {1000 * summary['first_frame']:.0f} ms, "
+          f"model ready {1000 * summary['model_ready']:.0f} ms")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"runs": results, "median": summary}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
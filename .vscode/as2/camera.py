@@ -0,0 +1,150 @@
+"""Camera probing, low-latency configuration and an on-disk camera cache.
+
+Probing indices one by one is slow (each failed cv2.VideoCapture() can take a
+second or more), so the working index and its capabilities are saved to
+~/.airshare/camera.json and tried first on the next start.
+
+By default the driver picks its own format and keeps several frames queued,
+which shows up as lag between a gesture and its detection. open_camera()
+applies a capture profile instead: it negotiates MJPG (falling back to YUYV),
+resolution and FPS, and asks for a one-frame buffer. Drivers that ignore
+CAP_PROP_BUFFERSIZE get wrapped in LowLatencyCapture, which drains queued
+frames with grab() before every read.
+"""
+
+import json
+import os
+import time
+
+import cv2
+
+CACHE_PATH = os.path.expanduser("~/.airshare/camera.json")
+CAMERA_INDICES = [0, 1, -1]
+
+# fourcc is a list of formats to try in order; None keeps the driver default
+CAPTURE_PROFILES = {
+    "driver-default": {"fourcc": None, "width": None, "height": None, "fps": None, "buffersize": None},
+    "low-latency": {"fourcc": ["MJPG", "YUYV"], "width": 640, "height": 480, "fps": 30, "buffersize": 1},
+    "mjpg-720p": {"fourcc": ["MJPG"], "width": 1280, "height": 720, "fps": 30, "buffersize": 1},
+    "yuyv-640": {"fourcc": ["YUYV"], "width": 640, "height": 480, "fps": 30, "buffersize": 1},
+    "mjpg-320-60": {"fourcc": ["MJPG"], "width": 320, "height": 240, "fps": 60, "buffersize": 1},
+}
+DEFAULT_PROFILE = "low-latency"
+
+
+def load_cache():
+    try:
+        with open(CACHE_PATH) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(info):
+    try:
+        os.makedirs(os.path.dirname(CACHE_PATH), exist_ok=True)
+        with open(CACHE_PATH, "w") as f:
+            json.dump(info, f, indent=2)
+    except OSError as e:
+        print(f"Could not save camera cache: {e}")
+
+
+def fourcc_name(cap):
+    code = int(cap.get(cv2.CAP_PROP_FOURCC))
+    return "".join(chr((code >> (8 * i)) & 0xFF) for i in range(4)).strip("\x00")
+
+
+def describe(cap, index):
+    """Capabilities of an opened camera, as stored in the cache"""
+    return {
+        "index": index,
+        "backend": cap.getBackendName(),
+        "fourcc": fourcc_name(cap),
+        "width": int(cap.get(cv2.CAP_PROP_FRAME_WIDTH)),
+        "height": int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT)),
+        "fps": cap.get(cv2.CAP_PROP_FPS),
+        "buffersize": int(cap.get(cv2.CAP_PROP_BUFFERSIZE)),
+    }
+
+
+def configure(cap, fourcc=None, width=None, height=None, fps=None, buffersize=None):
+    """Apply a capture profile; returns True if stale frames must be drained"""
+    for code in fourcc or []:
+        cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*code))
+        if fourcc_name(cap) == code:
+            break
+    # Format first: many drivers only offer some resolutions/rates per format
+    if width and height:
+        cap.set(cv2.CAP_PROP_FRAME_WIDTH, width)
+        cap.set(cv2.CAP_PROP_FRAME_HEIGHT, height)
+    if fps:
+        cap.set(cv2.CAP_PROP_FPS, fps)
+    if buffersize:
+        applied = cap.set(cv2.CAP_PROP_BUFFERSIZE, buffersize)
+        if not applied or int(cap.get(cv2.CAP_PROP_BUFFERSIZE)) != buffersize:
+            return True
+    return False
+
+
+class LowLatencyCapture:
+    """VideoCapture wrapper that skips frames already queued in the driver.
+
+    A grab() that returns in well under one frame interval came out of the
+    driver's buffer, so it is stale; keep grabbing until one has to wait for
+    the sensor, then retrieve() that one.
+    """
+
+    def __init__(self, cap, fps, max_drain=4):
+        self.cap = cap
+        self.max_drain = max_drain
+        self.stale_threshold = 0.5 / (fps or 30)
+        self.drained = 0
+
+    def read(self, image=None):
+        start = time.perf_counter()
+        if not self.cap.grab():
+            return False, None
+        for _ in range(self.max_drain):
+            if time.perf_counter() - start > self.stale_threshold:
+                break
+            start = time.perf_counter()
+            if not self.cap.grab():
+                return False, None
+            self.drained += 1
+        return self.cap.retrieve(image)
+
+    def __getattr__(self, name):
+        return getattr(self.cap, name)
+
+
+def open_camera(indices=CAMERA_INDICES, profile=DEFAULT_PROFILE):
+    """Open the cached camera (falling back to probing indices in order) and apply profile"""
+    cached = load_cache()
+    order = list(indices)
+    if cached.get("index") in order:
+        order.remove(cached["index"])
+        order.insert(0, cached["index"])
+
+    for camera_index in order:
+        try:
+            print(f"Trying to open camera {camera_index}")
+            cap = cv2.VideoCapture(camera_index)
+            if not cap.isOpened():
+                print(f"Failed to open camera {camera_index}")
+                continue
+            print(f"Successfully opened camera {camera_index}")
+            drain = configure(cap, **CAPTURE_PROFILES[profile])
+            info = describe(cap, camera_index)
+            info["profile"] = profile
+            info["drain"] = drain
+            print(f"📷 {info['fourcc'] or '?'} {info['width']}x{info['height']} @ {info['fps']:.0f} FPS, "
+                  f"buffer {info['buffersize']}{' (draining with grab())' if drain else ''}")
+            if info != cached:
+                save_cache(info)
+            if drain:
+                return LowLatencyCapture(cap, info["fps"])
+            return cap
+        except Exception as e:
+            print(f"Error opening camera {camera_index}: {e}")
+    print("Error: Could not open any camera")
+    return None
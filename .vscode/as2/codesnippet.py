@@ -2,12 +2,20 @@
 
 import os
 import cv2
+import argparse
 import socket
-import asyncio
 import websockets
 import mediapipe as mp
+from collections import deque
 from random import randint
 
+from camera import open_camera
+from file_index import FileIndex
+from framebuf import FramePool
+from netloop import NetLoop
+from speculative import SendSpeculator
+from sync import Syncer, receive_sync
+
 # ========== Pick Random Port ==========
 def get_free_port():
     sock = socket.socket()
@@ -30,84 +38,110 @@ os.makedirs(RECEIVE_FOLDER, exist_ok=True)
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(min_detection_confidence=0.8, min_tracking_confidence=0.8)
 
-def detect_open_hand(image):
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+def detect_open_hand(image_rgb):
     results = hands.process(image_rgb)
     return bool(results.multi_hand_landmarks)
 
-def get_latest_code_file(folder="."):
-    files = [
-        os.path.join(folder, f) for f in os.listdir(folder)
-        if os.path.isfile(f) and os.path.splitext(f)[1] in ALLOWED_EXTENSIONS
-    ]
-    if not files:
-        return None
-    return max(files, key=os.path.getmtime)
+# Kept up to date by inotify (or polling) instead of relisting the folder per gesture
+_file_indexes = {}
+PROJECT_DIR = "."  # the folder whose newest code file is sent (--project)
+
+def get_file_index(folder=None):
+    folder = folder or PROJECT_DIR
+    index = _file_indexes.get(folder)
+    if index is None:
+        index = _file_indexes[folder] = FileIndex(folder, ALLOWED_EXTENSIONS)
+        print(f"🗂️ Indexed {len(index)} code files under {index.root} ({index.backend})")
+    return index
+
+def get_latest_code_file(folder=None):
+    return get_file_index(folder).newest()
 
 # ========== Receiver ==========
-async def receive_files():
-    async def handler(ws):
+async def receive_file(ws):
+    try:
         filename = await ws.recv()
+        if filename.startswith("SYNC "):
+            await receive_sync(ws, filename, RECEIVE_FOLDER)
+            return
         data = await ws.recv()
-        save_path = os.path.join(RECEIVE_FOLDER, filename)
-        with open(save_path, 'wb') as f:
-            f.write(data)
-        print(f"\n📥 Received: {filename}")
-
-    print(f"🟢 Receiver ready on ws://0.0.0.0:{RECEIVE_PORT}")
-    async with websockets.serve(handler, "0.0.0.0", RECEIVE_PORT):
-        await asyncio.Future()
+    except websockets.exceptions.ConnectionClosedOK:
+        return  # sender cancelled a speculative connection
+    save_path = os.path.join(RECEIVE_FOLDER, filename)
+    with open(save_path, 'wb') as f:
+        f.write(data)
+    print(f"\n📥 Received: {filename}")
 
 # ========== Sender ==========
-async def sender_loop():
-    cap = cv2.VideoCapture(0)
-    sent = False
-
-    while cap.isOpened():
-        ret, frame = cap.read()
+# Capture and inference stay on this (main) thread; the receiver and all
+# sends live on one background event loop, so neither blocks the other.
+def sender_loop(net, sync=False):
+    cap = open_camera()
+    pool = FramePool(flip=False)
+    uri = f"ws://{PEER_IP}:{PEER_PORT}"
+    # An open hand starts locating/reading the file and connecting right away;
+    # the next send is armed again once the hand has left the frame
+    speculator = SendSpeculator(net, get_latest_code_file, uri)
+    # In sync mode an open hand mirrors every changed file instead
+    syncer = Syncer(get_file_index(), PEER_IP, uri) if sync else None
+    votes, armed, syncing = deque(maxlen=5), True, None
+
+    while cap is not None and cap.isOpened():
+        ret, frame, rgb_frame = pool.read(cap)
         if not ret:
             continue
 
-        if detect_open_hand(frame) and not sent:
-            print("✋ Open hand gesture detected! Preparing to send...")
-            file = get_latest_code_file()
-            if file:
-                await send_file(file)
-                sent = True
-                await asyncio.sleep(3)
-                sent = False
-            else:
-                print("⚠️ No valid code file found to send.")
+        if syncer is None:
+            if speculator.update(detect_open_hand(rgb_frame)):
+                print("✋ Open hand gesture detected! Preparing to send...")
+        else:
+            votes.append(detect_open_hand(rgb_frame))
+            if not any(votes):
+                armed = True
+            elif armed and sum(votes) >= 3 and (syncing is None or syncing.done()):
+                armed = False
+                print("✋ Open hand gesture detected! Syncing changed files...")
+                syncing = net.submit(syncer.sync())
 
         cv2.imshow("Gesture Sender", frame)
         if cv2.waitKey(5) & 0xFF == 27:
             break
 
-    cap.release()
+    speculator.cancel()
+    if cap is not None:
+        cap.release()
     cv2.destroyAllWindows()
 
-async def send_file(file_path):
-    filename = os.path.basename(file_path)
-    with open(file_path, "rb") as f:
-        data = f.read()
-
-    uri = f"ws://{PEER_IP}:{PEER_PORT}"
-    try:
-        async with websockets.connect(uri) as ws:
-            await ws.send(filename)
-            await ws.send(data)
-            print(f"📤 Sent: {filename} to {uri}")
-    except Exception as e:
-        print(f"❌ Failed to send {filename}: {e}")
-
 # ========== Main ==========
-async def main():
-    await asyncio.gather(
-        receive_files(),
-        sender_loop()
-    )
+def main(sync=False, project="."):
+    global PROJECT_DIR
+    root = os.path.abspath(os.path.expanduser(project))
+    if root in (os.path.expanduser("~"), os.path.abspath(os.sep)):
+        # A recursive index of the whole home directory would exhaust inotify watches
+        print(f"❌ Not indexing all of {root}: run from your project or pass --project <folder>")
+        return
+    if not os.path.isdir(root):
+        print(f"❌ Project folder not found: {root}")
+        return
+    PROJECT_DIR = root
+    net = NetLoop()
+    try:
+        net.serve(receive_file, "0.0.0.0", RECEIVE_PORT).result()
+    except OSError as e:
+        print(f"❌ Could not start receiver: {e}")
+        return
+    print(f"🟢 Receiver ready on ws://0.0.0.0:{RECEIVE_PORT}")
+    get_file_index()  # build the index before the first gesture
+    sender_loop(net, sync)
+    net.stop()
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="AirShare code file sender/receiver")
+    parser.add_argument("--sync", action="store_true",
+                        help="open hand sends every file changed since the last share to this peer")
+    parser.add_argument("--project", default=".",
+                        help="folder to watch for the newest code file (default: current folder)")
+    args = parser.parse_args()
     print(f"\n📡 Your receiving port is: {RECEIVE_PORT}")
     print("📨 Share this port number with the other device.\n")
-    asyncio.run(main())
\ No newline at end of file
+    main(args.sync, args.project)
\ No newline at end of file
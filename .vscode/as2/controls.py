@@ -0,0 +1,67 @@
+"""Keyboard-style controls for headless runs.
+
+Without a preview window there is no cv2.waitKey(), so commands come in as
+text lines instead, either typed on stdin or sent to a local control socket:
+
+    q                 quit
+    p 192.168.1.12    set partner IP
+    s /path/clip.mp4  select a file
+    k                 show this device's pairing code (see pairing.py)
+    y                 pair with the last scanned pairing code
+
+e.g. ``echo "p 192.168.1.12" | nc 127.0.0.1 5055``
+"""
+
+import queue
+import socket
+import sys
+import threading
+
+
+class Controls:
+    """Collects command lines from stdin and/or a localhost TCP socket"""
+
+    def __init__(self, use_stdin=True, port=None):
+        self.commands = queue.Queue()
+        if use_stdin:
+            threading.Thread(target=self._read_stdin, daemon=True).start()
+        if port:
+            threading.Thread(target=self._serve, args=(port,), daemon=True).start()
+
+    def _read_stdin(self):
+        for line in sys.stdin:
+            self.commands.put(line)
+        # stdin closed (e.g. piped input finished): nothing more will come
+
+    def _serve(self, port):
+        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+            s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            s.bind(("127.0.0.1", port))
+            s.listen(4)
+            print(f"🎛️  Control socket listening on 127.0.0.1:{port}")
+            while True:
+                conn, _ = s.accept()
+                threading.Thread(target=self._read_conn, args=(conn,), daemon=True).start()
+
+    def _read_conn(self, conn):
+        with conn, conn.makefile("r") as lines:
+            for line in lines:
+                self.commands.put(line)
+
+    def poll(self):
+        """Return (key, argument) for the next command, or (None, None)"""
+        try:
+            line = self.commands.get_nowait()
+        except queue.Empty:
+            return None, None
+        key, _, arg = line.strip().partition(" ")
+        return key[:1].lower() or None, arg.strip() or None
+
+
+def read_key(controls=None):
+    """One key per frame: from cv2.waitKey() normally, from controls when headless"""
+    if controls is not None:
+        return controls.poll()
+    import cv2
+    key = cv2.waitKey(1) & 0xFF
+    return (chr(key) if key != 0xFF else None), None
@@ -0,0 +1,239 @@
+"""Incremental index of a project tree, answering "newest file" in O(1).
+
+The tree is scanned once with os.scandir; after that it is kept up to date
+by inotify (through ctypes, Linux only) or, elsewhere, by a background
+scandir poll that diffs against the index. If a watch cannot be added (e.g.
+fs.inotify.max_user_watches is used up) the index warns and switches to
+polling rather than silently missing changes in that subtree. Files live in a dict of
+path -> mtime plus a max-heap on mtime; stale heap entries (files changed or
+removed since they were pushed) are skipped lazily when they reach the top,
+so newest() is O(1) amortized regardless of the number of files.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import heapq
+import os
+import select
+import struct
+import threading
+
+SKIP_DIRS = {"__pycache__", "node_modules", "venv", ".venv"}
+POLL_INTERVAL = 1.0
+
+# inotify(7)
+IN_MODIFY = 0x002
+IN_ATTRIB = 0x004
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_DELETE_SELF = 0x400
+IN_Q_OVERFLOW = 0x4000
+IN_IGNORED = 0x8000
+IN_ISDIR = 0x40000000
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO |
+              IN_CREATE | IN_DELETE | IN_DELETE_SELF)
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def _skipped(name):
+    """Hidden, cache and environment directories are never indexed"""
+    return name.startswith(".") or name in SKIP_DIRS
+
+
+def _load_libc():
+    try:
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        libc.inotify_init1
+        return libc
+    except (OSError, AttributeError):
+        return None
+
+
+_libc = _load_libc()
+
+
+class FileIndex:
+    """Files under root with one of extensions, newest first"""
+
+    def __init__(self, root, extensions, recursive=True, poll_interval=POLL_INTERVAL):
+        self.root = os.path.abspath(root)
+        self.extensions = {e.lower() for e in extensions}
+        self.recursive = recursive
+        self.poll_interval = poll_interval
+        self.mtimes = {}
+        self._heap = []
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._fd = None
+        self._watches = {}
+        self._watch_failed = False
+        if _libc is not None:
+            self._fd = _libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if self._fd < 0:
+                self._fd = None
+        self._scan(self.root)
+        if self._watch_failed:
+            os.close(self._fd)
+            self._fd = None
+        self.backend = "inotify" if self._fd is not None else "polling"
+        target = self._watch_loop if self._fd is not None else self._poll_loop
+        threading.Thread(target=target, daemon=True).start()
+
+    def newest(self):
+        """Path of the most recently modified file, or None"""
+        with self._lock:
+            while self._heap:
+                neg_mtime, path = self._heap[0]
+                if self.mtimes.get(path) == -neg_mtime:
+                    return path
+                heapq.heappop(self._heap)  # stale: changed or removed since pushed
+        return None
+
+    def paths(self):
+        """Snapshot of the indexed paths"""
+        with self._lock:
+            return list(self.mtimes)
+
+    def __len__(self):
+        return len(self.mtimes)
+
+    def close(self):
+        self._stop.set()
+
+    def _wanted(self, path):
+        return os.path.splitext(path)[1].lower() in self.extensions
+
+    def _set(self, path, mtime):
+        with self._lock:
+            if self.mtimes.get(path) == mtime:
+                return
+            self.mtimes[path] = mtime
+            heapq.heappush(self._heap, (-mtime, path))
+            if len(self._heap) > 2 * len(self.mtimes) + 64:
+                # Too many stale entries: rebuild
+                self._heap = [(-m, p) for p, m in self.mtimes.items()]
+                heapq.heapify(self._heap)
+
+    def _discard(self, path):
+        with self._lock:
+            self.mtimes.pop(path, None)
+
+    def _discard_tree(self, directory):
+        prefix = directory + os.sep
+        with self._lock:
+            for path in [p for p in self.mtimes if p.startswith(prefix)]:
+                del self.mtimes[path]
+
+    def _unwatch_tree(self, directory):
+        """Drop the watches of a directory moved out of place; their paths are stale"""
+        prefix = directory + os.sep
+        for wd, watched in list(self._watches.items()):
+            if watched == directory or watched.startswith(prefix):
+                del self._watches[wd]
+                _libc.inotify_rm_watch(self._fd, wd)
+
+    def _refresh(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            self._discard(path)
+            return
+        self._set(path, st.st_mtime)
+
+    def _walk(self, directory):
+        """(path, mtime) of wanted files under directory; adds inotify watches on the way"""
+        if self._fd is not None:
+            wd = _libc.inotify_add_watch(self._fd, os.fsencode(directory), WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = directory
+            else:
+                self._watch_failed_at(directory)
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive and not _skipped(entry.name):
+                                yield from self._walk(entry.path)
+                        elif entry.is_file() and self._wanted(entry.name):
+                            yield entry.path, entry.stat().st_mtime
+                    except OSError:
+                        continue
+        except OSError:
+            return
+
+    def _watch_failed_at(self, directory):
+        if self._watch_failed:
+            return
+        self._watch_failed = True
+        err = ctypes.get_errno()
+        hint = " (raise fs.inotify.max_user_watches)" if err == errno.ENOSPC else ""
+        print(f"⚠️ Could not watch {directory}: {os.strerror(err) if err else 'failed'}{hint}; polling {self.root} instead")
+
+    def _scan(self, directory):
+        for path, mtime in self._walk(directory):
+            self._set(path, mtime)
+
+    def _poll_loop(self):
+        while not self._stop.wait(self.poll_interval):
+            seen = dict(self._walk(self.root))
+            for path in set(self.mtimes) - set(seen):
+                self._discard(path)
+            for path, mtime in seen.items():
+                self._set(path, mtime)
+
+    def _watch_loop(self):
+        try:
+            while not self._stop.is_set() and not self._watch_failed:
+                ready, _, _ = select.select([self._fd], [], [], 0.5)
+                if not ready:
+                    continue
+                try:
+                    data = os.read(self._fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+                self._handle_events(data)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+        if self._watch_failed:
+            # A subtree could not be watched: fall back to polling everything
+            self.backend = "polling"
+            self._poll_loop()
+
+    def _handle_events(self, data):
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            name = data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0")
+            offset += EVENT_HEADER.size + length
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost: rescan everything
+                with self._lock:
+                    self.mtimes.clear()
+                self._scan(self.root)
+                continue
+            directory = self._watches.get(wd)
+            if directory is None:
+                continue
+            if mask & (IN_IGNORED | IN_DELETE_SELF):
+                self._watches.pop(wd, None)
+                continue
+            name = os.fsdecode(name)
+            path = os.path.join(directory, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and self.recursive and not _skipped(name):
+                    self._scan(path)
+                elif mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._discard_tree(path)
+                    if mask & IN_MOVED_FROM:
+                        self._unwatch_tree(path)
+            elif self._wanted(path):
+                if mask & (IN_DELETE | IN_MOVED_FROM):
+                    self._discard(path)
+                else:
+                    self._refresh(path)
@@ -0,0 +1,63 @@
+"""Preallocated frame buffers for the capture path.
+
+cap.read(), cv2.flip() and cv2.cvtColor() all allocate a new array per call
+by default. FramePool keeps a small ring of buffers and passes them as the
+output arrays instead, so once the first frame has sized the pool the steady
+state loop does no heap allocation for frames.
+"""
+
+import cv2
+import numpy as np
+
+
+class FrameSlot:
+    """One set of buffers: raw camera frame, mirrored BGR frame and RGB frame"""
+
+    def __init__(self, shape, flip):
+        self.raw = np.empty(shape, np.uint8)
+        self.frame = np.empty(shape, np.uint8) if flip else self.raw
+        self.rgb = np.empty(shape, np.uint8)
+
+
+class FramePool:
+    """Ring of FrameSlots; a slot stays valid until the pool wraps around to it"""
+
+    def __init__(self, size=2, flip=True, metrics=None):
+        self.size = size
+        self.flip = flip
+        self.metrics = metrics
+        self._slots = None
+        self._next = 0
+
+    def _allocate(self, shape):
+        self._slots = [FrameSlot(shape, self.flip) for _ in range(self.size)]
+
+    def read(self, cap):
+        """Read, mirror and convert one frame; returns (ok, frame, rgb_frame)"""
+        if self._slots is None:
+            ret, first = cap.read()
+            if not ret:
+                return False, None, None
+            self._allocate(first.shape)
+            np.copyto(self._slots[0].raw, first)
+            slot = self._slots[0]
+        else:
+            slot = self._slots[self._next]
+            ret, raw = cap.read(slot.raw)
+            if not ret:
+                return False, None, None
+            if raw is not slot.raw:
+                # Camera changed resolution mid-stream; resize the pool
+                self._allocate(raw.shape)
+                slot = self._slots[self._next]
+                np.copyto(slot.raw, raw)
+        self._next = (self._next + 1) % self.size
+        if self.metrics:
+            self.metrics.mark("capture")
+
+        if self.flip:
+            cv2.flip(slot.raw, 1, dst=slot.frame)
+        cv2.cvtColor(slot.frame, cv2.COLOR_BGR2RGB, dst=slot.rgb)
+        if self.metrics:
+            self.metrics.mark("convert")
+        return True, slot.frame, slot.rgb
@@ -0,0 +1,106 @@
+"""Gesture rules shared by the camera scripts and replay.py.
+
+The rules only look at the ``.y`` of each landmark, so they behave the same on
+live MediaPipe results and on landmark streams loaded from disk.
+"""
+
+# MediaPipe hand landmark indices (same values as mp_hands.HandLandmark)
+WRIST = 0
+THUMB_IP = 3
+THUMB_TIP = 4
+INDEX_FINGER_MCP = 5
+INDEX_FINGER_TIP = 8
+MIDDLE_FINGER_TIP = 12
+RING_FINGER_TIP = 16
+PINKY_MCP = 17
+PINKY_TIP = 20
+
+GESTURES = {
+    "pic": ("two_fingers", "fist", "palm"),
+    "pdf": ("send", "receive"),
+    "video": ("send", "receive"),
+}
+
+
+def _tips(landmarks):
+    return (landmarks[THUMB_TIP].y, landmarks[INDEX_FINGER_TIP].y,
+            landmarks[MIDDLE_FINGER_TIP].y, landmarks[RING_FINGER_TIP].y,
+            landmarks[PINKY_TIP].y)
+
+
+def is_two_fingers(landmarks):
+    """Index and middle finger up, ring and pinky down"""
+    thumb, index, middle, ring, pinky = _tips(landmarks)
+    return index < thumb and middle < thumb and ring > index and pinky > index
+
+
+def is_fist(landmarks):
+    """All fingertips below the thumb tip"""
+    thumb, index, middle, ring, pinky = _tips(landmarks)
+    return index > thumb and middle > thumb and ring > thumb and pinky > thumb
+
+
+def is_open_palm(landmarks):
+    """All fingertips above the thumb tip"""
+    thumb, index, middle, ring, pinky = _tips(landmarks)
+    return index < thumb and middle < thumb and ring < thumb and pinky < thumb
+
+
+def pic_gesture(landmarks, screenshot_taken=False, receiving_mode=False):
+    """Action for pic.py: 'screenshot', 'send', 'receive' or None"""
+    if is_two_fingers(landmarks) and not screenshot_taken:
+        return "screenshot"
+    elif is_fist(landmarks) and screenshot_taken:
+        return "send"
+    elif is_open_palm(landmarks) and not receiving_mode:
+        return "receive"
+    return None
+
+
+def pdf_gesture(landmarks):
+    """Thumbs-up is 'send', fist is 'receive' (pdf.py rules)"""
+    thumb_tip = landmarks[THUMB_TIP]
+    index_tip = landmarks[INDEX_FINGER_TIP]
+    index_mcp = landmarks[INDEX_FINGER_MCP]
+
+    # 👍 Thumbs-Up (Send)
+    if thumb_tip.y < landmarks[THUMB_IP].y and index_tip.y > thumb_tip.y:
+        return "send"
+
+    # 👊 Fist (Receive) - All fingertips below their MCP joints
+    if (index_tip.y > index_mcp.y and
+        landmarks[MIDDLE_FINGER_TIP].y > index_mcp.y and
+        landmarks[RING_FINGER_TIP].y > index_mcp.y and
+        landmarks[PINKY_TIP].y > landmarks[PINKY_MCP].y):
+        return "receive"
+    return None
+
+
+def video_gestures(landmarks):
+    """Set of gestures for video1.py; thumbs up and open hand can both match"""
+    wrist = landmarks[WRIST].y
+    found = set()
+    if landmarks[THUMB_TIP].y < wrist:
+        found.add("send")
+    finger_tips = (INDEX_FINGER_TIP, MIDDLE_FINGER_TIP, RING_FINGER_TIP, PINKY_TIP)
+    if sum(1 for tip in finger_tips if landmarks[tip].y < wrist) >= 3:
+        found.add("receive")
+    return found
+
+
+def classify(mode, landmarks):
+    """State-free set of gesture names for one hand, used for evaluation"""
+    if mode == "pic":
+        if is_two_fingers(landmarks):
+            return {"two_fingers"}
+        if is_fist(landmarks):
+            return {"fist"}
+        if is_open_palm(landmarks):
+            return {"palm"}
+        return set()
+    if mode == "pdf":
+        gesture = pdf_gesture(landmarks)
+        return {gesture} if gesture else set()
+    if mode == "video":
+        return video_gestures(landmarks)
+    raise ValueError(f"Unknown gesture mode: {mode}")
@@ -0,0 +1,70 @@
+"""Cached HUD overlay for the preview window.
+
+Each text item is rasterized once into a small strip (premultiplied colour
+plus inverse alpha). Strips are cached by content, so toggling an item or
+switching between a few states never re-renders; per frame each strip is
+blended onto the frame with one multiply-add on its ROI.
+"""
+
+import cv2
+import numpy as np
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+MAX_CACHED_STRIPS = 64
+
+
+class Hud:
+    """Named text items pre-rendered into strips and blended onto frames"""
+
+    def __init__(self):
+        self._items = {}
+        self._strips = {}
+        self._shape = None
+
+    def set(self, name, text, org, scale=0.5, color=(255, 255, 255), thickness=1):
+        """Show text at org; a negative y counts up from the bottom of the frame"""
+        self._items[name] = (text, org, scale, color, thickness)
+
+    def clear(self, name):
+        self._items.pop(name, None)
+
+    def _render(self, item, shape):
+        text, (x, y), scale, color, thickness = item
+        height, width = shape[:2]
+        if y < 0:
+            y += height
+        (w, h), baseline = cv2.getTextSize(text, FONT, scale, thickness)
+        pad = 2 * thickness + 1  # getTextSize does not cover the stroke width
+        left, top = x - pad, y - h - pad
+        bottom = y + baseline + pad
+        alpha = np.zeros((bottom - top, w + 2 * pad), np.uint8)
+        cv2.putText(alpha, text, (x - left, y - top), FONT, scale, 255, thickness, cv2.LINE_AA)
+
+        # Clip the strip to the frame
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(left + alpha.shape[1], width), min(bottom, height)
+        if x1 <= x0 or y1 <= y0:
+            return None
+        alpha = alpha[y0 - top:y1 - top, x0 - left:x1 - left]
+
+        # Premultiplied colour plus inverse alpha: out = frame * (1 - a) + colour * a
+        alpha3 = cv2.merge([alpha, alpha, alpha])
+        strip = cv2.multiply(np.full_like(alpha3, color), alpha3, scale=1 / 255)
+        inverse = cv2.bitwise_not(alpha3)
+        return (slice(y0, y1), slice(x0, x1)), strip, inverse
+
+    def draw(self, frame):
+        """Blend all items onto frame in place"""
+        if frame.shape != self._shape or len(self._strips) > MAX_CACHED_STRIPS:
+            self._shape = frame.shape
+            self._strips.clear()
+        for item in self._items.values():
+            rendered = self._strips.get(item)
+            if rendered is None and item not in self._strips:
+                rendered = self._strips[item] = self._render(item, frame.shape)
+            if rendered is not None:
+                region, strip, inverse = rendered
+                roi = frame[region]
+                cv2.multiply(roi, inverse, dst=roi, scale=1 / 255)
+                cv2.add(roi, strip, dst=roi)
+        return frame
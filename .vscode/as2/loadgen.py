@@ -0,0 +1,364 @@
+"""Synthetic senders for soak-testing the receive servers.
+
+    python loadgen.py pdf --host 127.0.0.1 --port 5001 --pid <receiver pid>
+    python loadgen.py snippet --port 53211 --concurrency 50 --duration 7200
+    python loadgen.py video --mix normal=70,churn=10,slow=10,disconnect=10
+
+Protocols match the real senders: "pdf" (pdf.py receive_file) and "snippet"
+(codesnippet.py receive_file) are websocket filename + bytes, "video" is
+video1.py's TCP header / ACK / data / DONE. Start the receiver as usual. For
+video1.py, run it with --headless (otherwise every received video is played,
+one after another) and enter receive mode: it receives concurrent
+connections, each on its own thread, until no new connection arrives for
+60 s. Start the run within that window.
+
+Each of --concurrency senders loops over behaviours drawn from --mix:
+
+    normal      send a whole file; latency = connect until the receiver is done
+                (websocket closed by the server after its handler, or DONE)
+    churn       connect and close straight away
+    slow        slow-loris: trickle --slow-rate bytes/s for --slow-hold seconds
+    disconnect  send a random part of the file, then reset the connection
+
+File sizes come from --dist (fixed, uniform up to 2x --size, or lognormal
+with median --size), capped at --max-size. Files are named loadgen_<n>.bin
+per sender, so the receiver's folder does not grow. video1.py is the
+exception: it names every received file by timestamp plus a counter, so
+received_videos/ grows by one file per transfer.
+
+Every --report seconds a line shows successful transfers and failures
+(by reason), receiver goodput, p50/p99/p99.9 latency and, with --pid, the
+receiver's open file descriptors and RSS against the start of the run.
+--json writes the same series for later comparison.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import statistics
+import struct
+import time
+from collections import Counter
+
+import websockets
+
+CHUNK_SIZE = 64 * 1024
+RESERVOIR = 10000  # latencies kept for the whole-run percentiles
+
+
+def parse_size(text):
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+    return int(text)
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        if name not in BEHAVIOURS:
+            raise argparse.ArgumentTypeError(f"unknown behaviour {name!r}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+class SizeDist:
+    def __init__(self, kind, size, max_size, sigma=1.0):
+        self.kind = kind
+        self.size = size
+        self.max_size = max_size
+        self.sigma = sigma
+
+    def sample(self, rng):
+        if self.kind == "fixed":
+            n = self.size
+        elif self.kind == "uniform":
+            n = rng.randint(1, 2 * self.size)
+        else:
+            n = int(rng.lognormvariate(0, self.sigma) * self.size)
+        return max(1, min(n, self.max_size))
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+def process_stats(pid):
+    """(open file descriptors, RSS bytes) of pid, or (None, None)"""
+    try:
+        fds = len(os.listdir(f"/proc/{pid}/fd"))
+        with open(f"/proc/{pid}/status") as f:
+            rss = next(int(line.split()[1]) * 1024 for line in f if line.startswith("VmRSS:"))
+        return fds, rss
+    except (OSError, StopIteration):
+        pass
+    try:
+        import psutil  # macOS/Windows
+        process = psutil.Process(pid)
+        return process.num_fds() if hasattr(process, "num_fds") else process.num_handles(), \
+            process.memory_info().rss
+    except Exception:
+        return None, None
+
+
+class Stats:
+    """Counters for the current report window plus whole-run totals"""
+
+    def __init__(self):
+        self.started = time.monotonic()
+        self.window_started = self.started
+        self.window = self._empty()
+        self.total = self._empty()
+        self.all_latencies = []
+        self.seen_latencies = 0
+        self.open_slow = 0
+        self.rng = random.Random(0)
+
+    @staticmethod
+    def _empty():
+        return {"ok": 0, "bytes": 0, "latencies": [], "done": Counter(), "failed": Counter()}
+
+    def success(self, nbytes, latency):
+        for bucket in (self.window, self.total):
+            bucket["ok"] += 1
+            bucket["bytes"] += nbytes
+        self.window["latencies"].append(latency)
+        # Reservoir sample, so a multi-hour run keeps bounded memory
+        self.seen_latencies += 1
+        if len(self.all_latencies) < RESERVOIR:
+            self.all_latencies.append(latency)
+        else:
+            i = self.rng.randrange(self.seen_latencies)
+            if i < RESERVOIR:
+                self.all_latencies[i] = latency
+
+    def finished(self, behaviour):
+        self.window["done"][behaviour] += 1
+        self.total["done"][behaviour] += 1
+
+    def failure(self, reason):
+        self.window["failed"][reason] += 1
+        self.total["failed"][reason] += 1
+
+    def roll(self):
+        """Close the report window; returns it with its length in seconds"""
+        now = time.monotonic()
+        window, seconds = self.window, now - self.window_started
+        self.window, self.window_started = self._empty(), now
+        return window, seconds
+
+
+def failure_reason(e):
+    if isinstance(e, asyncio.TimeoutError):
+        return "timeout"
+    if isinstance(e, websockets.exceptions.ConnectionClosed):
+        return f"closed {e.rcvd.code}" if e.rcvd else "closed"
+    if isinstance(e, ConnectionError) and e.args:
+        return str(e.args[0])
+    return type(e).__name__
+
+
+# ---------- websocket protocol (pdf.py, codesnippet.py) ----------
+
+async def ws_transfer(args, stats, behaviour, name, data):
+    uri = f"ws://{args.host}:{args.port}"
+    start = time.monotonic()
+    async with websockets.connect(uri, open_timeout=args.timeout, max_size=None,
+                                  ping_interval=None, close_timeout=args.timeout) as ws:
+        if behaviour == "churn":
+            return None
+        await ws.send(name)
+        if behaviour == "normal":
+            await ws.send(data)
+            await asyncio.wait_for(ws.wait_closed(), args.timeout)  # handler returned
+            if ws.close_code != 1000:
+                raise ConnectionError(f"closed {ws.close_code}")  # e.g. 1009: over the server's max_size
+            return time.monotonic() - start
+        if behaviour == "slow":
+            await ws.send(trickle(args, stats, data))
+        else:
+            await ws.send(cut_off(ws, data, random.randrange(len(data))))
+    return None
+
+
+async def trickle(args, stats, data):
+    """Fragments of --slow-rate bytes per second for --slow-hold seconds"""
+    stats.open_slow += 1
+    try:
+        deadline = time.monotonic() + args.slow_hold
+        offset = 0
+        while time.monotonic() < deadline and offset < len(data):
+            yield data[offset:offset + args.slow_rate]
+            offset += args.slow_rate
+            await asyncio.sleep(1)
+    finally:
+        stats.open_slow -= 1
+
+
+async def cut_off(ws, data, stop_at):
+    for offset in range(0, len(data), CHUNK_SIZE):
+        if offset >= stop_at:
+            ws.transport.abort()
+            return
+        yield data[offset:offset + CHUNK_SIZE]
+
+
+# ---------- TCP protocol (video1.py) ----------
+
+async def tcp_transfer(args, stats, behaviour, name, data):
+    start = time.monotonic()
+    reader, writer = await asyncio.wait_for(asyncio.open_connection(args.host, args.port), args.timeout)
+    try:
+        if behaviour == "churn":
+            return None
+        writer.write(f"{len(data)} 0.000 0".encode())
+        if await asyncio.wait_for(reader.read(1024), args.timeout) != b"ACK":
+            raise ConnectionError("no ACK")
+        if behaviour == "slow":
+            stats.open_slow += 1
+            try:
+                deadline = time.monotonic() + args.slow_hold
+                for offset in range(0, len(data), args.slow_rate):
+                    if time.monotonic() >= deadline:
+                        break
+                    writer.write(data[offset:offset + args.slow_rate])
+                    await writer.drain()
+                    await asyncio.sleep(1)
+            finally:
+                stats.open_slow -= 1
+            return None
+        stop_at = random.randrange(len(data)) if behaviour == "disconnect" else len(data)
+        for offset in range(0, stop_at, CHUNK_SIZE):
+            writer.write(data[offset:min(offset + CHUNK_SIZE, stop_at)])
+            await writer.drain()
+        if behaviour == "disconnect":
+            sock = writer.get_extra_info("socket")
+            sock.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack("ii", 1, 0))  # RST
+            return None
+        if await asyncio.wait_for(reader.read(1024), args.timeout) != b"DONE":
+            raise ConnectionError("no DONE")
+        return time.monotonic() - start
+    finally:
+        writer.close()
+
+
+BEHAVIOURS = ("normal", "churn", "slow", "disconnect")
+TRANSFERS = {"pdf": ws_transfer, "snippet": ws_transfer, "video": tcp_transfer}
+
+
+async def sender(n, args, stats, payload, deadline):
+    rng = random.Random(n)
+    transfer = TRANSFERS[args.protocol]
+    behaviours, weights = zip(*args.mix.items())
+    name = f"loadgen_{n}.bin"
+    while time.monotonic() < deadline:
+        behaviour = rng.choices(behaviours, weights)[0]
+        size = args.dist.sample(rng)
+        try:
+            latency = await transfer(args, stats, behaviour, name, payload[:size])
+            stats.finished(behaviour)
+            if latency is not None:
+                stats.success(size, latency)
+        except Exception as e:
+            if behaviour == "disconnect":
+                stats.finished(behaviour)  # the receiver may notice first
+            else:
+                stats.failure(failure_reason(e))
+                await asyncio.sleep(0.5)  # e.g. the receiver is not listening: do not spin
+        if args.interval:
+            await asyncio.sleep(rng.expovariate(1 / args.interval))
+
+
+def report_line(stats, window, seconds, baseline, pid):
+    elapsed = time.monotonic() - stats.started
+    lat = window["latencies"]
+    failed = sum(window["failed"].values())
+    reasons = ", ".join(f"{r} {c}" for r, c in window["failed"].most_common(3))
+    entry = {"t": round(elapsed, 1), "ok": window["ok"], "failed": dict(window["failed"]),
+             "done": dict(window["done"]), "mb_s": window["bytes"] / seconds / 1e6 if seconds else 0.0,
+             "p50_ms": 1000 * percentile(lat, 50), "p99_ms": 1000 * percentile(lat, 99),
+             "p999_ms": 1000 * percentile(lat, 99.9), "open_slow": stats.open_slow}
+    line = (f"[{time.strftime('%H:%M:%S', time.gmtime(elapsed))}] ok {window['ok']} fail {failed}"
+            f"{f' ({reasons})' if reasons else ''} | {entry['mb_s']:.1f} MB/s | p50 {entry['p50_ms']:.1f} "
+            f"p99 {entry['p99_ms']:.1f} p99.9 {entry['p999_ms']:.1f} ms | slow open {stats.open_slow}")
+    if pid:
+        fds, rss = process_stats(pid)
+        entry.update(fds=fds, rss=rss)
+        if fds is not None:
+            line += (f" | fds {fds} ({fds - baseline[0]:+d}) rss {rss / 1e6:.1f} MB "
+                     f"({(rss - baseline[1]) / 1e6:+.1f})")
+    return line, entry
+
+
+async def run(args):
+    payload = memoryview(os.urandom(args.max_size))  # sliced per transfer without copying
+    stats = Stats()
+    baseline = process_stats(args.pid) if args.pid else (None, None)
+    if args.pid and baseline[0] is None:
+        print(f"⚠️ Cannot read fd/memory stats of pid {args.pid}")
+    deadline = time.monotonic() + args.duration
+    series = []
+    senders = [asyncio.ensure_future(sender(n, args, stats, payload, deadline)) for n in range(args.concurrency)]
+    print(f"🔨 {args.concurrency} senders -> {args.protocol} at {args.host}:{args.port} for {args.duration:.0f}s")
+    try:
+        while time.monotonic() < deadline:
+            await asyncio.sleep(min(args.report, max(0.0, deadline - time.monotonic())))
+            line, entry = report_line(stats, *stats.roll(), baseline, args.pid)
+            print(line)
+            series.append(entry)
+    finally:
+        for task in senders:
+            task.cancel()
+        await asyncio.gather(*senders, return_exceptions=True)
+
+    total, lat = stats.total, stats.all_latencies
+    elapsed = time.monotonic() - stats.started
+    print(f"\n📊 {total['ok']} transfers, {total['bytes'] / 1e6:.1f} MB in {elapsed:.0f}s "
+          f"({total['bytes'] / elapsed / 1e6:.1f} MB/s)")
+    print(f"   latency p50 {1000 * percentile(lat, 50):.1f} p99 {1000 * percentile(lat, 99):.1f} "
+          f"p99.9 {1000 * percentile(lat, 99.9):.1f} max {1000 * max(lat, default=0):.1f} ms"
+          f"{f' (mean {1000 * statistics.mean(lat):.1f})' if lat else ''}")
+    print(f"   behaviours {dict(total['done'])}, failures {dict(total['failed'])}")
+    if series and "fds" in series[-1] and series[-1]["fds"] is not None:
+        print(f"   receiver fds {baseline[0]} -> {series[-1]['fds']}, "
+              f"rss {baseline[1] / 1e6:.1f} -> {series[-1]['rss'] / 1e6:.1f} MB")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": {k: str(v) for k, v in vars(args).items()}, "series": series}, f, indent=1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("protocol", choices=sorted(TRANSFERS))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument("--pid", type=int, help="receiver process, for fd and memory growth")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=60, help="seconds (hours: e.g. 14400)")
+    parser.add_argument("--report", type=float, default=10, help="seconds between report lines")
+    parser.add_argument("--interval", type=float, default=0.0, help="mean pause between a sender's transfers")
+    parser.add_argument("--mix", type=parse_mix, default="normal=85,churn=5,slow=5,disconnect=5")
+    parser.add_argument("--dist", choices=("fixed", "uniform", "lognormal"), default="lognormal")
+    parser.add_argument("--size", type=parse_size, default="256K", help="fixed/median size")
+    parser.add_argument("--sigma", type=float, default=1.0, help="lognormal spread")
+    parser.add_argument("--max-size", type=parse_size, default="8M")
+    parser.add_argument("--slow-rate", type=int, default=64, help="bytes/s of a slow-loris sender")
+    parser.add_argument("--slow-hold", type=float, default=30, help="seconds a slow-loris sender stays")
+    parser.add_argument("--timeout", type=float, default=30)
+    parser.add_argument("--json", help="write the report series here")
+    args = parser.parse_args()
+    args.dist = SizeDist(args.dist, args.size, args.max_size, args.sigma)
+    try:
+        asyncio.run(run(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
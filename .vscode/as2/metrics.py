@@ -0,0 +1,181 @@
+"""Per-stage timing for the gesture loop.
+
+The loop calls ``metrics.mark(stage)`` after each stage and
+``metrics.end_frame()`` at the top of every iteration. Each mark records the
+time since the previous mark (time.perf_counter, monotonic), so stages never
+overlap. The last ``window`` frames are kept per stage and summarized as
+p50/p95/p99.
+
+Results can be shown as an on-screen panel, appended to a JSONL file every
+few seconds, and served as Prometheus text on http://127.0.0.1:<port>/metrics.
+When metrics are off the loop gets NULL_METRICS, whose methods do nothing.
+"""
+
+import json
+import threading
+import time
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _percentile(ordered, pct):
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+class NullMetrics:
+    """Stand-in used when metrics are disabled"""
+
+    def __bool__(self):
+        return False
+
+    def mark(self, stage):
+        pass
+
+    def end_frame(self):
+        pass
+
+    def draw_panel(self, frame):
+        pass
+
+
+NULL_METRICS = NullMetrics()
+
+
+class Metrics:
+    """Rolling per-stage latency histograms"""
+
+    def __init__(self, window=600, show_panel=False):
+        self.window = window
+        self.show_panel = show_panel
+        self.samples = {}
+        self.frames = 0
+        self.started = time.perf_counter()
+        self._last = self.started
+        self._frame = {}
+        self._frame_start = self.started
+        self._frame_times = deque(maxlen=window)
+        self._panel = []
+        self._panel_time = 0.0
+
+    def mark(self, stage):
+        """Charge the time since the previous mark to stage"""
+        now = time.perf_counter()
+        self._frame[stage] = self._frame.get(stage, 0.0) + (now - self._last)
+        self._last = now
+
+    def end_frame(self):
+        """Commit the marks of the current frame (no-op if nothing was marked)"""
+        now = time.perf_counter()
+        if not self._frame:
+            self._frame_start = self._last = now
+            return
+        for stage, seconds in self._frame.items():
+            if stage not in self.samples:
+                self.samples[stage] = deque(maxlen=self.window)
+            self.samples[stage].append(seconds)
+        self._frame.clear()
+        self._frame_times.append(now - self._frame_start)
+        self._frame_start = self._last = now
+        self.frames += 1
+
+    def snapshot(self):
+        """Stage -> {count, p50, p95, p99} in seconds, plus overall FPS"""
+        stages = {}
+        for stage, values in list(self.samples.items()):
+            ordered = sorted(values)
+            if ordered:
+                stages[stage] = {
+                    "count": len(ordered),
+                    "p50": _percentile(ordered, 50),
+                    "p95": _percentile(ordered, 95),
+                    "p99": _percentile(ordered, 99),
+                }
+        frame_times = list(self._frame_times)
+        fps = len(frame_times) / sum(frame_times) if frame_times and sum(frame_times) else 0.0
+        return {"time": time.time(), "frames": self.frames, "fps": fps, "stages": stages}
+
+    def draw_panel(self, frame):
+        """Debug panel in the top-right corner, refreshed once a second"""
+        if not self.show_panel:
+            return
+        import cv2
+
+        now = time.perf_counter()
+        if now - self._panel_time > 1.0:
+            snap = self.snapshot()
+            self._panel = [f"{snap['fps']:5.1f} FPS      p50   p95   p99 ms"]
+            for stage, s in snap["stages"].items():
+                self._panel.append(f"{stage:<9}{1000 * s['p50']:6.1f}{1000 * s['p95']:6.1f}{1000 * s['p99']:6.1f}")
+            self._panel_time = now
+        x = frame.shape[1] - 290
+        for i, line in enumerate(self._panel):
+            cv2.putText(frame, line, (x, 20 + 16 * i), cv2.FONT_HERSHEY_PLAIN, 1, (0, 255, 255), 1)
+
+    def prometheus(self):
+        snap = self.snapshot()
+        lines = ["# TYPE airshare_stage_seconds summary"]
+        for stage, s in snap["stages"].items():
+            for q in ("p50", "p95", "p99"):
+                quantile = int(q[1:]) / 100
+                lines.append(f'airshare_stage_seconds{{stage="{stage}",quantile="{quantile}"}} {s[q]:.6f}')
+            lines.append(f'airshare_stage_seconds_count{{stage="{stage}"}} {s["count"]}')
+        lines.append("# TYPE airshare_fps gauge")
+        lines.append(f"airshare_fps {snap['fps']:.2f}")
+        lines.append("# TYPE airshare_frames_total counter")
+        lines.append(f"airshare_frames_total {snap['frames']}")
+        return "\n".join(lines) + "\n"
+
+    def start_log(self, path, interval=5.0):
+        """Append a snapshot to a JSONL file every interval seconds"""
+        def run():
+            while True:
+                time.sleep(interval)
+                with open(path, "a") as f:
+                    f.write(json.dumps(self.snapshot()) + "\n")
+
+        threading.Thread(target=run, daemon=True).start()
+
+    def start_http(self, port):
+        """Serve /metrics (Prometheus text) and /metrics.json on localhost"""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body, kind = metrics.prometheus(), "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body, kind = json.dumps(metrics.snapshot()), "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                data = body.encode()
+                self.send_response(200)
+                self.send_header("Content-Type", kind)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", port), Handler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"📈 Metrics on http://127.0.0.1:{port}/metrics")
+
+
+def add_arguments(parser):
+    parser.add_argument("--metrics", action="store_true", help="show the per-stage timing panel")
+    parser.add_argument("--metrics-log", metavar="FILE", help="append timing snapshots to a JSONL file")
+    parser.add_argument("--metrics-port", type=int, help="serve Prometheus metrics on this localhost port")
+
+
+def from_args(args):
+    """Metrics for the parsed command line, or NULL_METRICS when all are off"""
+    if not (args.metrics or args.metrics_log or args.metrics_port):
+        return NULL_METRICS
+    metrics = Metrics(show_panel=args.metrics)
+    if args.metrics_log:
+        metrics.start_log(args.metrics_log)
+    if args.metrics_port:
+        metrics.start_http(args.metrics_port)
+    return metrics
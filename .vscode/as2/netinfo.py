@@ -0,0 +1,33 @@
+"""Local address lookup kept off the frame loop.
+
+The address is resolved on a background thread at startup, then again every
+``interval`` seconds or whenever refresh() is called (pic.py does so after a
+failed send attempt and when the partner is changed with 'p'), so the camera
+loop only ever reads a cached string.
+"""
+
+import threading
+
+
+class CachedAddress:
+    """Caches resolver() and re-runs it in the background"""
+
+    def __init__(self, resolver, interval=30.0, default="127.0.0.1"):
+        self.value = default
+        self._resolver = resolver
+        self._interval = interval
+        self._wake = threading.Event()
+        threading.Thread(target=self._run, daemon=True).start()
+
+    def _run(self):
+        while True:
+            try:
+                self.value = self._resolver()
+            except Exception as e:
+                print(f"Error getting IP address: {e}")
+            self._wake.wait(self._interval)
+            self._wake.clear()
+
+    def refresh(self):
+        """Re-resolve now instead of waiting for the next interval"""
+        self._wake.set()
@@ -0,0 +1,38 @@
+"""A long-running asyncio event loop on a background thread.
+
+The camera loop is synchronous, so network work is handed to this loop with
+submit() instead of spinning up a fresh loop with asyncio.run() per send.
+Receive servers live on the same loop (serve()), so they keep accepting while
+the camera thread captures and runs inference.
+"""
+
+import asyncio
+import threading
+
+import websockets
+
+
+class NetLoop:
+    """Event loop running forever on a daemon thread"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule coro on the loop; returns a concurrent.futures.Future"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def serve(self, handler, host, port):
+        """Start a websocket server on the loop; returns a Future of the server"""
+        async def start():
+            return await websockets.serve(handler, host, port)
+        return self.submit(start())
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
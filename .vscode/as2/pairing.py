@@ -0,0 +1,223 @@
+"""Pairing by QR code, read from frames the gesture loop already captures.
+
+Each device can show a QR code with its address, port and, when it has a TLS
+identity (see secure.py), its certificate fingerprint and pairing secret:
+
+    AIRSHARE <ip> <port> [<fingerprint> <secret>]
+
+Fingerprint and secret are base64url instead of hex, which keeps the code at
+41x41 modules so it still reads from a laptop screen across a desk.
+
+QrScanner takes one frame in SCAN_EVERY, downscales it to SCAN_WIDTH and runs
+cv2.QRCodeDetector on a worker thread, so hand tracking keeps its frame rate
+(~20 ms per scan at 640 px, about twice a second). A scanned code is only
+offered: nothing changes until the user presses 'y', so a code that happens
+to be in view cannot add a recipient. Confirming adds the partner to the send
+targets and pins its fingerprint/secret in the PeerStore. A code for an
+address that is already pinned to another certificate is refused; re-pin on
+purpose with `python secure.py pair`.
+
+Pairing makes this device the client: for --secure in both directions, each
+device scans the other's code.
+
+    python pairing.py <this ip> [port]     # save this device's code as a PNG
+"""
+
+import base64
+import os
+import sys
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+PREFIX = "AIRSHARE"
+SCAN_EVERY = 15
+SCAN_WIDTH = 640
+REOFFER_AFTER = 5.0  # seconds before a code still (or again) in view is offered again
+QR_PATH = os.path.expanduser("~/.airshare/pairing.png")
+
+Pairing = namedtuple("Pairing", "ip port fingerprint secret")
+
+
+def _b64(hex_text):
+    return base64.urlsafe_b64encode(bytes.fromhex(hex_text)).decode().rstrip("=")
+
+
+def _hex(b64_text):
+    return base64.urlsafe_b64decode(b64_text + "=" * (-len(b64_text) % 4)).hex()
+
+
+def payload(ip, port, identity=None):
+    """QR text for this device; identity is a secure.Identity or None"""
+    text = f"{PREFIX} {ip} {port}"
+    if identity is not None:
+        text += f" {_b64(identity.fingerprint)} {_b64(identity.secret)}"
+    return text
+
+
+def parse_payload(text):
+    """Pairing from a scanned code, or None if it is not one of ours"""
+    parts = text.split()
+    if len(parts) not in (3, 5) or parts[0] != PREFIX or not parts[2].isdigit():
+        return None
+    fingerprint = secret = None
+    if len(parts) == 5:
+        try:
+            fingerprint, secret = _hex(parts[3]), _hex(parts[4])
+        except ValueError:
+            return None
+    return Pairing(parts[1], int(parts[2]), fingerprint, secret)
+
+
+def load_identity():
+    """This device's secure.Identity, or None if one cannot be created here"""
+    try:
+        from secure import Identity
+        return Identity()
+    except Exception as e:
+        print(f"⚠️ No TLS identity for the pairing code ({e}); it will only carry the address")
+        return None
+
+
+def make_qr(text, size=400):
+    """Black-on-white BGR image of a QR code for text, about size pixels wide"""
+    try:
+        import qrcode
+        qr = qrcode.QRCode(box_size=1, border=4)
+        qr.add_data(text)
+        qr.make(fit=True)
+        modules = [[not dark for dark in row] for row in qr.get_matrix()]
+        image = np.array(modules, np.uint8) * 255
+    except ImportError:
+        # OpenCV has its own encoder; it leaves no quiet zone, so add one
+        image = cv2.QRCodeEncoder.create().encode(text)
+        image = cv2.copyMakeBorder(image, 4, 4, 4, 4, cv2.BORDER_CONSTANT, value=255)
+    scale = max(1, size // image.shape[0])
+    image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=cv2.INTER_NEAREST)
+    return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+
+
+def save_qr(text, path=QR_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    cv2.imwrite(path, make_qr(text))
+    return path
+
+
+class QrScanner:
+    """Samples camera frames for a partner's pairing code off the frame loop"""
+
+    def __init__(self, every=SCAN_EVERY, width=SCAN_WIDTH, reoffer_after=REOFFER_AFTER):
+        self.every = every
+        self.width = width
+        self.reoffer_after = reoffer_after
+        self._detector = cv2.QRCodeDetector()
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="qr")
+        self._pending = None
+        self._frames = 0
+        self._last = None
+        self._last_time = 0.0
+
+    def feed(self, frame):
+        """Call once per (mirrored) frame; returns a new Pairing when one was scanned"""
+        self._frames += 1
+        found = None
+        if self._pending is not None:
+            if not self._pending.done():
+                return None
+            found = self._pending.result()
+            self._pending = None
+        if self._frames >= self.every:
+            self._frames = 0
+            # A copy: the frame buffer is reused for the next capture (see framebuf.py)
+            h, w = frame.shape[:2]
+            if w > self.width:
+                small = cv2.resize(frame, (self.width, h * self.width // w), interpolation=cv2.INTER_AREA)
+            else:
+                small = frame.copy()
+            self._pending = self._executor.submit(self._scan, small)
+        return found
+
+    def _scan(self, small):
+        small = cv2.flip(small, 1)  # undo the preview mirroring, or the code cannot be read
+        try:
+            text = self._detector.detectAndDecode(small)[0]
+        except cv2.error:
+            return None
+        now = time.monotonic()
+        if not text or (text == self._last and now - self._last_time < self.reoffer_after):
+            return None
+        pairing = parse_payload(text)
+        if pairing is not None:
+            # The code stays in view for a while: report it once per reoffer_after,
+            # so an offer that was missed comes back
+            self._last, self._last_time = text, now
+        return pairing
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _peer_store(peers):
+    if peers is None:
+        from secure import PeerStore
+        peers = PeerStore()
+    return peers
+
+
+def _conflict(pairing, peers):
+    """Fingerprint the address is already pinned to, if the code carries a different one"""
+    known = peers.get(pairing.ip) if pairing.fingerprint else None
+    if known and known["fingerprint"] != pairing.fingerprint:
+        return known["fingerprint"]
+    return None
+
+
+def offer(pairing, peers=None, targets=()):
+    """Announce a scanned code; returns it if it may be confirmed with 'y', else None.
+
+    Codes of partners already in targets (and pinned the same way) are ignored.
+    """
+    peers = _peer_store(peers)
+    known = _conflict(pairing, peers)
+    if pairing.ip in targets and not known and (
+            not pairing.fingerprint or peers.get(pairing.ip) is not None):
+        return None
+    if known:
+        print(f"\n⛔ Ignoring pairing code from {pairing.ip}: it is pinned to another certificate "
+              f"({known[:16]}...). Re-pair on purpose with 'python secure.py pair'.")
+        return None
+    print(f"\n📷 Pairing code from {pairing.ip} seen: press 'y' to pair")
+    return pairing
+
+
+def pair(pairing, sessions, peers=None, port=None):
+    """Add a confirmed partner to the send targets and pin its TLS identity.
+
+    peers should be the running SecureChannel's PeerStore so it sees the pin.
+    Refuses (returns None) to re-pin an address to a different certificate.
+    """
+    if pairing.fingerprint:
+        peers = _peer_store(peers)
+        if _conflict(pairing, peers):
+            print(f"⛔ Not pairing: {pairing.ip} is pinned to another certificate")
+            return None
+        peers.pair(pairing.ip, pairing.fingerprint, pairing.secret)
+    targets = sessions.state.targets
+    if pairing.ip not in targets:
+        targets = sessions.set_targets(targets + (pairing.ip,))
+    secured = " (TLS pinned)" if pairing.fingerprint else ""
+    print(f"\n🔗 Paired with {pairing.ip}{secured}; sending to {', '.join(targets)}")
+    if port is not None and pairing.port != port:
+        print(f"⚠️ {pairing.ip} listens on port {pairing.port}, this app uses {port}")
+    return targets
+
+
+if __name__ == "__main__":
+    if len(sys.argv) not in (2, 3):
+        print("Usage: python pairing.py <this ip> [port]")
+        sys.exit(1)
+    text = payload(sys.argv[1], int(sys.argv[2]) if len(sys.argv) == 3 else 5001, load_identity())
+    print(f"🔳 Pairing code saved to {save_qr(text)}")
@@ -2,17 +2,28 @@ import cv2
 import mediapipe as mp
 import pygetwindow as gw
 import os
-import asyncio
+import json
 import websockets
 
+import gestures
+import tracing
+from camera import open_camera
+from framebuf import FramePool
+from netloop import NetLoop
+from pdf_index import PdfIndex
+from speculative import SendSpeculator
+
 mp_hands = mp.solutions.hands
 hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
 
+# PDFs under ~/Downloads (or AIRSHARE_PDF_ROOTS), kept in a persistent index
+pdf_index = PdfIndex()
+
 # Ask for peer IP
 peer_ip = input("Enter the peer's IP (receiver enters sender's, sender enters receiver's): ").strip()
 
-def get_active_file():
-    """ Get the active PDF file opened on the screen """
+def get_active_file(manual=True):
+    """ Get the active PDF file opened on the screen (manual=False: never prompt) """
     try:
         window = gw.getActiveWindow()
         if window:
@@ -35,21 +46,13 @@ def get_active_file():
                         possible_titles.append(title_text.split(separator)[0].strip())
                 
                 print(f"Looking for PDFs matching: {possible_titles}")
-                downloads_folder = os.path.join(os.path.expanduser("~"), "Downloads")
-                
-                # List all PDF files in downloads folder
-                all_pdfs = [f for f in os.listdir(downloads_folder) if f.lower().endswith('.pdf')]
-                print(f"Available PDFs: {all_pdfs}")
                 
-                # Try to find a match by checking if any title is a substring of any PDF file
-                for pdf in all_pdfs:
-                    pdf_lower = pdf.lower()
-                    for title in possible_titles:
-                        title_lower = title.lower()
-                        if title_lower in pdf_lower or pdf_lower.startswith(title_lower.replace(" ", "-")):
-                            return os.path.join(downloads_folder, pdf)
+                # Rank indexed PDFs by fuzzy name similarity to the window title
+                match = pdf_index.best_match(possible_titles)
+                if match:
+                    return match
                 
-                print(f"No matching PDF found in {downloads_folder}")
+                print(f"No matching PDF found in {', '.join(pdf_index.roots)}")
             else:
                 print("Could not get window title")
         else:
@@ -58,13 +61,12 @@ def get_active_file():
         print(f"Error getting active file: {e}")
     
     # Fallback to manual selection
-    return select_pdf_manually()
+    return select_pdf_manually() if manual else None
 
 def select_pdf_manually():
-    """ Let user select a PDF from Downloads folder """
+    """ Let user select a PDF from the indexed folders """
     try:
-        downloads_folder = os.path.join(os.path.expanduser("~"), "Downloads")
-        pdf_files = [f for f in os.listdir(downloads_folder) if f.lower().endswith('.pdf')]
+        pdf_files = pdf_index.all_files()
         
         if not pdf_files:
             print("No PDF files found in Downloads folder")
@@ -72,7 +74,7 @@ def select_pdf_manually():
             
         print("\nAvailable PDF files:")
         for i, file in enumerate(pdf_files, 1):
-            print(f"{i}. {file}")
+            print(f"{i}. {os.path.basename(file)}")
             
         selection = input("\nEnter the number of the file to send (or 'q' to cancel): ")
         if selection.lower() == 'q':
@@ -81,8 +83,7 @@ def select_pdf_manually():
         try:
             index = int(selection) - 1
             if 0 <= index < len(pdf_files):
-                selected_file = pdf_files[index]
-                return os.path.join(downloads_folder, selected_file)
+                return pdf_files[index]
             else:
                 print("Invalid selection number")
         except ValueError:
@@ -92,93 +93,89 @@ def select_pdf_manually():
         print(f"Error listing PDF files: {e}")
     return None
 
-def detect_gesture(image):
-    """ Detects hand gestures for sending and receiving """
-    image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+def detect_gesture(image_rgb):
+    """ Detects hand gestures for sending and receiving (expects an RGB frame) """
     results = hands.process(image_rgb)
     
     if results.multi_hand_landmarks:
         for hand_landmarks in results.multi_hand_landmarks:
-            thumb_tip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_TIP]
-            thumb_ip = hand_landmarks.landmark[mp_hands.HandLandmark.THUMB_IP]
-            index_tip = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_TIP]
-            pinky_tip = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_TIP]
-            middle_tip = hand_landmarks.landmark[mp_hands.HandLandmark.MIDDLE_FINGER_TIP]
-            ring_tip = hand_landmarks.landmark[mp_hands.HandLandmark.RING_FINGER_TIP]
-            index_mcp = hand_landmarks.landmark[mp_hands.HandLandmark.INDEX_FINGER_MCP]
-            pinky_mcp = hand_landmarks.landmark[mp_hands.HandLandmark.PINKY_MCP]
-            
-            # 👍 Thumbs-Up (Send)
-            if thumb_tip.y < thumb_ip.y and index_tip.y > thumb_tip.y:
-                return "send"
-            
-            # 👊 Fist (Receive) - All fingertips below their MCP joints
-            if (index_tip.y > index_mcp.y and 
-                middle_tip.y > index_mcp.y and 
-                ring_tip.y > index_mcp.y and 
-                pinky_tip.y > pinky_mcp.y):
-                return "receive"
+            gesture = gestures.pdf_gesture(hand_landmarks.landmark)
+            if gesture:
+                return gesture
     return None
 
-async def send_file():
-    """ Sends the detected file to the receiver """
-    file_path = get_active_file()
-    if file_path and os.path.exists(file_path):
-        print(f"📂 Sending file: {file_path}")
-        try:
-            async with websockets.connect(f"ws://{peer_ip}:5001", open_timeout=10) as websocket:
-                filename = os.path.basename(file_path)
-                await websocket.send(filename)  
-                with open(file_path, "rb") as f:
-                    await websocket.send(f.read())  
-                print("✅ File sent successfully!")
-        except Exception as e:
-            print(f"❌ Error sending file: {e}")
-    else:
-        print("❌ No valid PDF found!")
-
 async def receive_file(websocket):
     """ Receives a file from sender """
     try:
-        filename = await websocket.recv()  
+        # Traced sends start with a clock exchange (see tracing.py)
+        trace_id, filename = await tracing.answer_clock(websocket, await websocket.recv())
+        started = tracing.now_us()
         file_data = await websocket.recv()  
+        received = tracing.now_us()
         
         save_path = os.path.join(os.path.expanduser("~"), "Downloads", filename)
         with open(save_path, "wb") as f:
             f.write(file_data)
+            f.flush()
+            os.fsync(f.fileno())
         
         print(f"✅ File received: {save_path}")
+        if trace_id:
+            await websocket.send(json.dumps([
+                {"name": "receive data", "ph": "X", "ts": started, "dur": received - started,
+                 "args": {"bytes": len(file_data)}},
+                {"name": "last byte received", "ph": "i", "s": "g", "ts": received, "args": {}},
+                {"name": "write + fsync", "ph": "X", "ts": received, "dur": tracing.now_us() - received,
+                 "args": {"path": save_path}},
+            ]))
+    except websockets.exceptions.ConnectionClosedOK:
+        pass  # sender cancelled a speculative connection
     except Exception as e:
         print(f"❌ Error receiving file: {e}")
 
-async def start_receiver():
-    """ Starts the WebSocket server to listen for incoming files """
+def start_receiver(net):
+    """ Starts the WebSocket server on the network loop; it keeps running in the background """
     print("📡 Waiting for files on port 5001...")
-    async with websockets.serve(receive_file, "0.0.0.0", 5001):  
-        await asyncio.Future()
+    server = net.serve(receive_file, "0.0.0.0", 5001)
+    server.add_done_callback(report_receiver_error)
+    return server
+
+def report_receiver_error(server):
+    if server.exception() is not None:
+        print(f"❌ Could not start receiver: {server.exception()}")
 
 # Start camera for gesture detection
-cap = cv2.VideoCapture(0)
+cap = open_camera()
+pool = FramePool()
+
+# Sends and the receive server run on one background event loop. While a
+# thumbs-up is forming the file is already located/read and the connection
+# opened (see speculative.py).
+net = NetLoop()
+receiver = None
+speculator = SendSpeculator(net, lambda: get_active_file(manual=False), f"ws://{peer_ip}:5001",
+                            fallback=select_pdf_manually)
 
-while cap.isOpened():
-    ret, frame = cap.read()
+while cap is not None and cap.isOpened():
+    ret, flipped_frame, rgb_frame = pool.read(cap)
     if not ret:
         break
+    captured = tracing.now_us()
 
-    flipped_frame = cv2.flip(frame, 1)
-    gesture = detect_gesture(flipped_frame)
+    gesture = detect_gesture(rgb_frame)
     
-    if gesture == "send":
+    if speculator.update(gesture == "send", captured):
         print("👍 Thumbs-Up detected! Sending file...")
-        asyncio.run(send_file())
     
-    elif gesture == "receive":
+    elif gesture == "receive" and receiver is None:
         print("👊 Fist detected! Starting receiver mode...")
-        asyncio.run(start_receiver())
+        receiver = start_receiver(net)
     
     cv2.imshow("Gesture Control", flipped_frame)
     if cv2.waitKey(1) & 0xFF == ord("q"):
         break
 
-cap.release()
+if cap is not None:
+    cap.release()
 cv2.destroyAllWindows()
+net.stop()
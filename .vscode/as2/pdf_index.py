@@ -0,0 +1,198 @@
+"""Persistent, incrementally refreshed index of PDFs for get_active_file().
+
+Roots default to ~/Downloads; set AIRSHARE_PDF_ROOTS (os.pathsep separated)
+to index more folders. The folder listings are saved in
+~/.airshare/pdf_index.json together with each folder's mtime. A background
+thread refreshes every REFRESH_INTERVAL: it only stats the folders and
+re-lists the ones whose mtime changed (a folder's mtime moves when entries
+are added, removed or renamed). Hidden folders and file_index.SKIP_DIRS are
+not descended into. Lookups never touch the disk; they read the last
+snapshot, which at startup is the saved one.
+
+Lookup normalizes names (lowercase, no extension, punctuation to spaces) and
+ranks candidates by shared character trigrams (Dice coefficient) through an
+inverted index, with a bonus when the window title appears in the file name.
+A match is only used when it clears MIN_SCORE (the title is in the name, or
+the names are near-identical) and leads the runner-up by MIN_LEAD; anything
+weaker goes to the manual picker, as the plain substring match used to.
+"""
+
+import json
+import os
+import re
+import threading
+from collections import defaultdict
+
+import numpy as np
+
+from file_index import SKIP_DIRS
+
+INDEX_PATH = os.path.expanduser("~/.airshare/pdf_index.json")
+DEFAULT_ROOTS = [os.path.join(os.path.expanduser("~"), "Downloads")]
+REFRESH_INTERVAL = 2.0
+FIRST_SCAN_WAIT = 5.0  # a lookup waits this long for the first walk when nothing was saved
+MIN_SCORE = 0.6  # substring bonus (0.5) plus a little overlap, or a near-identical name
+MIN_LEAD = 0.1  # over the second best, so ambiguous titles are not guessed
+SHORTLIST = 50  # candidates checked for the substring bonus
+
+
+def configured_roots():
+    env = os.environ.get("AIRSHARE_PDF_ROOTS")
+    if env:
+        return [os.path.expanduser(r) for r in env.split(os.pathsep) if r]
+    return DEFAULT_ROOTS
+
+
+def normalize(name):
+    name = os.path.splitext(name)[0] if name.lower().endswith(".pdf") else name
+    return " ".join(re.sub(r"[^0-9a-z]+", " ", name.lower()).split())
+
+
+def _skipped(name):
+    return name.startswith(".") or name in SKIP_DIRS
+
+
+def trigrams(text):
+    padded = f"  {text} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class PdfIndex:
+    """PDF files under roots, searchable by fuzzy name"""
+
+    def __init__(self, roots=None, path=INDEX_PATH, recursive=True):
+        self.roots = [os.path.abspath(r) for r in (roots or configured_roots())]
+        self.path = path
+        self.recursive = recursive
+        self.dirs = {}  # dir -> {"mtime", "pdfs", "subdirs"}
+        self._lock = threading.Lock()
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._load()
+        self._build_lookup()
+        if self.dirs:
+            self._ready.set()  # search the saved snapshot until the first refresh lands
+        threading.Thread(target=self._refresh_loop, daemon=True).start()
+
+    def close(self):
+        self._stop.set()
+
+    def _refresh_loop(self):
+        while True:
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Error refreshing PDF index: {e}")
+            self._ready.set()
+            if self._stop.wait(REFRESH_INTERVAL):
+                return
+
+    def _load(self):
+        try:
+            with open(self.path) as f:
+                data = json.load(f)
+            if data.get("roots") == self.roots:
+                self.dirs = data["dirs"]
+        except (OSError, ValueError, KeyError):
+            self.dirs = {}
+
+    def _save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump({"roots": self.roots, "dirs": self.dirs}, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save PDF index: {e}")
+
+    def refresh(self):
+        """Re-list folders whose mtime changed (run by the background thread)"""
+        with self._lock:
+            seen, changed = set(), False
+            stack = list(self.roots)
+            while stack:
+                directory = stack.pop()
+                if directory in seen:
+                    continue
+                seen.add(directory)
+                try:
+                    mtime = os.stat(directory).st_mtime
+                except OSError:
+                    continue
+                entry = self.dirs.get(directory)
+                if entry is None or entry["mtime"] != mtime:
+                    entry = self.dirs[directory] = self._list(directory, mtime)
+                    changed = True
+                if self.recursive:
+                    stack.extend(os.path.join(directory, d) for d in entry["subdirs"] if not _skipped(d))
+            for directory in set(self.dirs) - seen:
+                del self.dirs[directory]
+                changed = True
+            if changed:
+                self._build_lookup()
+                self._save()
+
+    def _list(self, directory, mtime):
+        pdfs, subdirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for e in entries:
+                    try:
+                        if e.is_dir(follow_symlinks=False) and not _skipped(e.name):
+                            subdirs.append(e.name)
+                        elif e.name.lower().endswith(".pdf") and e.is_file():
+                            pdfs.append(e.name)
+                    except OSError:
+                        continue
+        except OSError:
+            pass
+        return {"mtime": mtime, "pdfs": sorted(pdfs), "subdirs": subdirs}
+
+    def _build_lookup(self):
+        files = [os.path.join(d, name) for d, entry in self.dirs.items() for name in entry["pdfs"]]
+        names = [normalize(os.path.basename(p)) for p in files]
+        sizes = np.zeros(len(names))
+        postings = defaultdict(list)
+        for i, name in enumerate(names):
+            grams = trigrams(name)
+            sizes[i] = len(grams)
+            for gram in grams:
+                postings[gram].append(i)
+        postings = {gram: np.array(ids, np.int32) for gram, ids in postings.items()}
+        self._lookup = (files, names, sizes, postings)  # swapped in one go for readers
+
+    def _snapshot(self):
+        self._ready.wait(FIRST_SCAN_WAIT)
+        return self._lookup
+
+    def search(self, titles, limit=5):
+        """Best (score, path) matches for any of the candidate titles"""
+        files, names, sizes, postings = self._snapshot()
+        best = {}
+        for title in titles:
+            query = normalize(title)
+            hits = [postings[g] for g in trigrams(query) if g in postings]
+            if not query or not hits:
+                continue
+            shared = np.bincount(np.concatenate(hits), minlength=len(files))
+            scores = 2 * shared / (len(trigrams(query)) + sizes)
+            shortlist = np.argpartition(-scores, min(SHORTLIST, len(files) - 1))[:SHORTLIST]
+            for i in shortlist.tolist():
+                score = float(scores[i]) + (0.5 if query in names[i] else 0.0)
+                if score > best.get(i, 0):
+                    best[i] = score
+        ranked = sorted(best.items(), key=lambda item: -item[1])[:limit]
+        return [(score, files[i]) for i, score in ranked]
+
+    def best_match(self, titles):
+        """Path of the best match if it is good and unambiguous enough, or None"""
+        matches = self.search(titles, limit=2)
+        if not matches or matches[0][0] < MIN_SCORE:
+            return None
+        if len(matches) > 1 and matches[0][0] - matches[1][0] < MIN_LEAD:
+            return None
+        return matches[0][1]
+
+    def all_files(self):
+        return sorted(self._snapshot()[0], key=lambda p: os.path.basename(p).lower())
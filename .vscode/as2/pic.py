@@ -1,22 +1,38 @@
+import time
+STARTED = time.perf_counter()  # for time-to-first-frame
+
+import argparse
 import cv2
-import mediapipe as mp
-import pyautogui
+import os
 import socket
 import threading
-import os
-import time
-from PIL import Image
 
-#  MediaPipe Hands
-mp_hands = mp.solutions.hands
-mp_drawing = mp.solutions.drawing_utils
-hands = mp_hands.Hands(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+import gestures
+import metrics as stage_metrics
+from delta import DeltaEncoder, apply_delta
+from camera import CAPTURE_PROFILES, DEFAULT_PROFILE, open_camera
+from controls import Controls, read_key
+from framebuf import FramePool
+from hud import Hud
+from netinfo import CachedAddress
+from pairing import QrScanner, load_identity, make_qr, offer, pair, payload, save_qr
+from screencap import CODECS, DEFAULT_CODEC, EXTENSIONS, ScreenCapturer
+from secure import SecureChannel, open_connection
+from session import SessionRegistry
+from telemetry import TransferLog
+from viewer import Viewer
+from warmup import HandsLoader
+
+# mediapipe, mss/pyautogui and PIL are imported lazily: MediaPipe Hands is
+# built on a background thread (see warmup.py) while the camera opens
 
-screenshot_path = "screenshot.png"
 PORT = 5001
-receiving_mode = False
-receive_thread = None
-partner_ip = None  
+# Partners, receive mode and per-peer stats; the latest received screenshot's
+# id (state.received_id, if the sender sent one) lets deltas patch it
+sessions = SessionRegistry(log=TransferLog("pic"))
+viewer = Viewer()
+channel = None  # SecureChannel with --secure
+local_ip = None  # CachedAddress of this device, started by detect_gestures()
 
 def get_ip_address():
     """Get the local IP address of the device."""
@@ -27,241 +43,435 @@ def get_ip_address():
         print(f"Error getting IP address: {e}")
         return "127.0.0.1"
 
-def send_screenshot():
-    """Send screenshot to the stored partner IP address."""
-    global partner_ip
-    
+def report_screenshot(pending):
+    """Done callback of a capture: print timings or the error"""
     try:
-        if not os.path.exists(screenshot_path):
+        print(f"\n📸 Screenshot taken! ({pending.result().describe()})")
+    except Exception as e:
+        print(f"Error taking screenshot: {e}")
+
+def send_screenshot(pending, delta=None):
+    """Send a captured screenshot (a Future from ScreenCapturer) to every partner.
+
+    With several partners the sends run in parallel threads.
+    """
+    try:
+        if pending is None:
             print("No screenshot found to send!")
             return
-            
-        if not partner_ip:
-            print("No partner IP address configured. Use 'p' key to configure.")
-            return
+        shot = pending.result()
+    except Exception as e:
+        print(f"Error sending screenshot: {e}")
+        return
 
+    targets = sessions.state.targets
+    if not targets:
+        print("No partner IP address configured. Use 'p' key to configure.")
+        return
+    if len(targets) == 1:
+        send_screenshot_to(targets[0], shot, delta)
+        return
+    threads = [threading.Thread(target=send_screenshot_to, args=(peer, shot, delta)) for peer in targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def send_screenshot_to(partner_ip, shot, delta=None):
+    """Send a Screenshot to one partner.
+
+    With a DeltaEncoder only the tiles changed since the partner's last
+    screenshot are sent, falling back to the full image if they NAK it.
+    """
+    try:
         print(f"Sending screenshot to {partner_ip}...")
+        full_header = f"{len(shot.data)} {shot.ext}"
+        payload = None
+        if delta is not None:
+            start = time.perf_counter()
+            hashes, image_id, payload, changed = delta.prepare(partner_ip, shot.image)
+            full_header += f" {image_id}"
+            if payload is not None:
+                print(f"Δ {changed}/{hashes.size} tiles changed, {len(payload) / 1024:.0f} KiB instead of "
+                      f"{len(shot.data) / 1024:.0f} KiB ({1000 * (time.perf_counter() - start):.0f} ms)")
         max_retries = 3
         retry_delay = 2  # seconds
         
-        for attempt in range(max_retries):
-            try:
-                with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-                    s.settimeout(5)  # 5 second timeout for connection
-                    s.connect((partner_ip, PORT))
+        # One record per screenshot, however many attempts it takes
+        with sessions.transfer(partner_ip, "send", "screenshot" + shot.ext) as transfer:
+            for attempt in range(max_retries):
+                transfer.retries = attempt
+                try:
+                    # 5 second timeout for connection
+                    with open_connection(partner_ip, PORT, 5, channel) as s:
                     
-                    # Send file size first
-                    file_size = os.path.getsize(screenshot_path)
-                    s.send(str(file_size).encode())
-                    
-                    # Wait for acknowledgment
-                    s.recv(1024)
-                    
-                    # Send the file
-                    with open(screenshot_path, 'rb') as f:
-                        data = f.read(1024)
-                        while data:
-                            s.send(data)
-                            data = f.read(1024)
+                        # Send size and image type (or the delta's base image) first
+                        if payload is not None:
+                            s.send(f"{len(payload)} delta {delta.sent[partner_ip][0]}".encode())
+                            if s.recv(1024) == b"ACK":
+                                transfer.mark_first_byte()
+                                s.sendall(payload)
+                                transfer.done(len(payload))
+                            else:
+                                payload = None  # receiver has a different base image
+                        if payload is None:
+                            s.send(full_header.encode())
+                        
+                            # Wait for acknowledgment
+                            s.recv(1024)
+                        
+                            # Send the encoded bytes straight from memory
+                            transfer.mark_first_byte()
+                            s.sendall(shot.data)
+                            transfer.done(len(shot.data))
+                        if delta is not None:
+                            delta.delivered(partner_ip, image_id, hashes)
                     
-                    print(f"Screenshot sent successfully to {partner_ip}!")
-                    return
+                        print(f"Screenshot sent successfully to {partner_ip}!")
+                        return
                     
-            except ConnectionRefusedError:
-                if attempt < max_retries - 1:
-                    print(f"Connection refused. Make sure the receiver is in receive mode. Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
-                else:
-                    print("Error: Receiver is not in receive mode. Ask them to use the open palm gesture (✋) first.")
-            except Exception as e:
-                print(f"Error on attempt {attempt + 1}: {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(retry_delay)
+                except ConnectionRefusedError:
+                    if attempt < max_retries - 1:
+                        print(f"Connection refused. Make sure the receiver is in receive mode. Retrying in {retry_delay} seconds...")
+                        time.sleep(retry_delay)
+                    else:
+                        print("Error: Receiver is not in receive mode. Ask them to use the open palm gesture (✋) first.")
+                except Exception as e:
+                    print(f"Error on attempt {attempt + 1}: {e}")
+                    if local_ip is not None:
+                        local_ip.refresh()  # the network may have changed under us
+                    if attempt < max_retries - 1:
+                        time.sleep(retry_delay)
                 
     except Exception as e:
         print(f"Error sending screenshot: {e}")
 
 def start_receive_server():
-    """Start the receive server in a separate thread."""
-    global receiving_mode
-    receiving_mode = True
+    """Start the receive server in a separate thread.
+
+    It keeps accepting screenshots until none arrives for 60 seconds; each
+    connection is received on its own thread, so several partners can send at
+    once. Decoding and display happen on the viewer's worker (see viewer.py).
+    """
+    sessions.update(receiving=True)
     
     def receive_server():
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
                 s.bind(('', PORT))
                 s.settimeout(60)  # 60 second timeout (increased from 30)
-                s.listen(1)
+                s.listen(8)
                 print(f"\n📱 Ready to receive! Your IP address is: {get_ip_address()}")
                 print("Waiting for incoming screenshots... (60 second timeout)")
                 
-                conn, addr = s.accept()
-                with conn:
-                    print(f"\nReceiving screenshot from {addr[0]}")
-                    
-                    # Receive file size first
-                    file_size = int(conn.recv(1024).decode())
-                    conn.send(b"ACK")
-                    
-                    # Receive the file
-                    received_data = b""
-                    while len(received_data) < file_size:
-                        data = conn.recv(1024)
-                        if not data:
-                            break
-                        received_data += data
-                    
-                    # Save the received screenshot
-                    with open("received_screenshot.png", 'wb') as f:
-                        f.write(received_data)
-                    
-                    print("✅ Screenshot received successfully!")
-                    # Automatically open the received screenshot
-                    try:
-                        img = Image.open("received_screenshot.png")
-                        img.show()
-                    except Exception as e:
-                        print(f"Error opening received image: {e}")
+                while True:
+                    conn, addr = s.accept()
+                    threading.Thread(target=receive_connection, args=(conn, addr), daemon=True).start()
                     
         except socket.timeout:
             print("\n⏰ Receive mode timed out. Use open palm gesture (✋) to start receiving again.")
         except Exception as e:
             print(f"\n❌ Error receiving screenshot: {e}")
         finally:
-            global receiving_mode
-            receiving_mode = False
+            sessions.update(receiving=False)
     
     return threading.Thread(target=receive_server, daemon=True)
 
-def configure_partner_ip():
-    """Configure the partner's IP address."""
-    global partner_ip
-    partner_ip = input("\n🔄 Enter your partner's IP address: ")
-    print(f"Partner IP set to: {partner_ip}")
-    return partner_ip    
+def receive_connection(conn, addr):
+    """Handshake (with --secure) and receive on a connection's own thread"""
+    try:
+        if channel is not None:
+            conn = channel.accept(conn)
+        with conn:
+            receive_screenshot(conn, addr)
+    except Exception as e:
+        print(f"\n❌ Error receiving screenshot: {e}")
+        conn.close()
 
-def detect_gestures():
-    """Detects hand gestures for taking, sending, and receiving screenshots."""
-    global receive_thread, receiving_mode, partner_ip
+def receive_screenshot(conn, addr):
+    """Receive one screenshot (full or delta) on an accepted connection."""
+    print(f"\nReceiving screenshot from {addr[0]}")
+    with sessions.transfer(addr[0], "receive") as transfer:
+        # Receive file size and image type (older senders only send a PNG size) first
+        header = conn.recv(1024).decode().split()
+        base_image = None
+        if header[1:2] == ["delta"]:
+            # Only deltas need the full-resolution base; decode it (once) now
+            base = viewer.full() if header[2:3] == [sessions.state.received_id] else None
+            base_image = base.result() if base is not None else None
+            if base_image is None:
+                conn.send(b"NAK")  # not the base image of this delta: ask for the full one
+                header = conn.recv(1024).decode().split()
+        file_size = int(header[0])
+        kind = header[1] if len(header) > 1 else ".png"
+        ext = kind if kind in EXTENSIONS else ".png"
+        conn.send(b"ACK")
     
-    # Try different camera indices
-    for camera_index in [0, 1, -1]:
-        try:
-            print(f"Trying to open camera {camera_index}")
-            cap = cv2.VideoCapture(camera_index)
-            
-            if not cap.isOpened():
-                print(f"Failed to open camera {camera_index}")
-                continue
-                
-            print(f"Successfully opened camera {camera_index}")
-            break
-        except Exception as e:
-            print(f"Error opening camera {camera_index}: {e}")
-            continue
+        # Receive the file
+        received_data = bytearray()
+        while len(received_data) < file_size:
+            data = conn.recv(65536)
+            if not data:
+                break
+            transfer.mark_first_byte()
+            received_data += data
+    
+        # Save the received screenshot; the preview thumbnail is decoded on the viewer's worker
+        received_path = "received_screenshot" + ext
+        transfer.name = received_path
+        if kind == "delta":
+            if base_image is None:
+                raise ValueError("delta sent after NAK")
+            image = base_image.copy()
+            sessions.update(received_id=apply_delta(image, received_data))
+            viewer.received_image(image, received_path)
+        else:
+            viewer.received(received_data)
+            sessions.update(received_id=header[2] if len(header) > 2 else None)
+            # Written aside and swapped in, so concurrent receives never interleave
+            part_path = f"{received_path}.{threading.get_ident()}.part"
+            with open(part_path, 'wb') as f:
+                f.write(received_data)
+            os.replace(part_path, received_path)
+        transfer.done(len(received_data))
+    
+        print(f"✅ Screenshot received successfully! Press 'v' to view it full size ({received_path})")
+
+def configure_partner_ip(partners=None):
+    """Configure the partners' IP addresses (comma separated)."""
+    if partners is None:
+        partners = input("\n🔄 Enter your partner's IP address (several: comma separated, "
+                         "empty to scan their pairing code): ")
+    targets = sessions.set_targets(partners)
+    if targets:
+        print(f"Partner IP set to: {', '.join(targets)}")
+    else:
+        print("No partner yet: hold their pairing code ('k' on their side) up to the camera")
+    return targets
+
+def show_pairing_code(ip, headless=False):
+    """Show this device's pairing QR code (saved as a PNG when headless)"""
+    identity = channel.identity if channel is not None else load_identity()
+    text = payload(ip, PORT, identity)
+    if headless:
+        print(f"🔳 Pairing code for {ip} saved to {save_qr(text)}")
     else:
-        print("Error: Could not open any camera")
+        cv2.imshow("AirShare - Pairing code", make_qr(text))
+
+def detect_gestures(headless=False, control_port=None, metrics=stage_metrics.NULL_METRICS,
+                    partner=None, startup_bench=False, camera_profile=DEFAULT_PROFILE,
+                    codec=DEFAULT_CODEC, quality=None, delta=False, secure=False):
+    """Detects hand gestures for taking, sending, and receiving screenshots.
+
+    With headless=True nothing is drawn or shown; keys come from stdin or the
+    local control socket instead (see controls.py). metrics times each stage
+    of the loop (see metrics.py). startup_bench exits after the first preview
+    frame and prints the time it took (see bench_startup.py). Screenshots
+    are grabbed and encoded with codec/quality on a worker (see screencap.py);
+    with delta=True repeated shares only send changed tiles (see delta.py).
+    secure=True sends and receives over pinned TLS to paired peers (see secure.py).
+    A partner's pairing code held up to the camera pairs with it (see pairing.py).
+    """
+    global channel, local_ip
+    if secure:
+        channel = SecureChannel()
+        print(f"🔐 Secure transport on, fingerprint {channel.identity.fingerprint[:16]}...")
+    # Load the hand model in the background while the camera opens
+    loader = HandsLoader(min_detection_confidence=0.7, min_tracking_confidence=0.7)
+
+    # Last working camera first, then the usual indices
+    cap = open_camera(profile=camera_profile)
+    if cap is None:
         return
 
     # Configure partner IP at startup
+    local_ip = CachedAddress(get_ip_address)
+    hud = Hud()
     print(f"\n📱 Your IP address is: {get_ip_address()}")
-    partner_ip = configure_partner_ip()
+    prompt_start = time.perf_counter()
+    configure_partner_ip(partner)
+    # Time spent typing at the prompt is not startup time
+    prompt_seconds = time.perf_counter() - prompt_start if partner is None else 0.0
 
     screenshot_taken = False
+    capturer = ScreenCapturer(codec, quality)
+    delta_encoder = DeltaEncoder(codec, quality) if delta else None
+    screenshot = None
+    scanner = QrScanner()  # partners' pairing codes, sampled from the camera frames
+    pending_pairing = None  # scanned, waiting for 'y'
+    full_view = None  # full-size decode of a received screenshot, requested with 'v'
     
     print("\n👋 Gesture Controls:")
     print("✌  Two Fingers to take a screenshot")
     print("✊  Closed Fist to send screenshot to pre-configured IP")
     print("✋  Open Palm to enter receive mode (60 second timeout)")
     print("Press 'p' to change partner IP address")
+    print("Press 'v' to view the last received screenshot full size")
+    print("Press 'k' to show your pairing code (partners pair by pointing their camera at it)")
+    print("Press 'y' to pair with a scanned pairing code")
     print("Press 'q' to quit\n")
+
+    controls = Controls(port=control_port) if headless else None
+    if headless:
+        print("🕶️  Headless mode: type 'p <ip>', 'k', 'y' or 'q' (stdin or control socket)\n")
+
+    pool = FramePool(metrics=metrics)
+    frames = 0
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
     
     try:
         while True:
-            ret, frame = cap.read()
+            metrics.end_frame()
+            # Read, flip and convert into reused buffers
+            ret, frame, rgb_frame = pool.read(cap)
             if not ret:
                 print("Error: Couldn't read frame from camera")
                 break
-
-            frame = cv2.flip(frame, 1)
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            frames += 1
+            pairing = scanner.feed(frame)
+            if pairing is not None:
+                pending_pairing = offer(pairing, channel.peers if channel is not None else None,
+                                        sessions.state.targets) or pending_pairing
             
-            try:
-                result = hands.process(rgb_frame)
-            except Exception as e:
-                print(f"Error processing frame: {e}")
-                continue
+            # Until the model is ready, frames are only previewed
+            hands = loader.get()
+            result = None
+            if hands is not None:
+                try:
+                    result = hands.process(rgb_frame)
+                    metrics.mark("process")
+                except Exception as e:
+                    print(f"Error processing frame: {e}")
+                    continue
 
-            if result.multi_hand_landmarks:
+            if result is not None and result.multi_hand_landmarks:
                 for hand_landmarks in result.multi_hand_landmarks:
                     try:
-                        mp_drawing.draw_landmarks(frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+                        if not headless:
+                            loader.mp_drawing.draw_landmarks(frame, hand_landmarks, loader.mp_hands.HAND_CONNECTIONS)
+                            metrics.mark("draw")
                         
-                        landmarks = hand_landmarks.landmark
-                        thumb_tip = landmarks[mp_hands.HandLandmark.THUMB_TIP].y
-                        index_tip = landmarks[mp_hands.HandLandmark.INDEX_FINGER_TIP].y
-                        middle_tip = landmarks[mp_hands.HandLandmark.MIDDLE_FINGER_TIP].y
-                        ring_tip = landmarks[mp_hands.HandLandmark.RING_FINGER_TIP].y
-                        pinky_tip = landmarks[mp_hands.HandLandmark.PINKY_TIP].y
+                        gesture = gestures.pic_gesture(hand_landmarks.landmark,
+                                                       screenshot_taken, sessions.state.receiving)
+                        metrics.mark("gestures")
 
                         # Gesture: Two Fingers Up (Take Screenshot)
-                        if (index_tip < thumb_tip and middle_tip < thumb_tip and
-                            ring_tip > index_tip and pinky_tip > index_tip and not screenshot_taken):
-                            try:
-                                screenshot = pyautogui.screenshot()
-                                screenshot.save(screenshot_path)
-                                screenshot_taken = True
-                                print("\n📸 Screenshot taken!")
-                                time.sleep(1)
-                            except Exception as e:
-                                print(f"Error taking screenshot: {e}")
+                        if gesture == "screenshot":
+                            screenshot = capturer.capture()
+                            screenshot.add_done_callback(report_screenshot)
+                            screenshot_taken = True
+                            time.sleep(1)
                         
                         # Gesture: Closed Fist (Send Screenshot)
-                        elif (index_tip > thumb_tip and middle_tip > thumb_tip and
-                              ring_tip > thumb_tip and pinky_tip > thumb_tip and screenshot_taken):
-                            send_screenshot()
+                        elif gesture == "send":
+                            send_screenshot(screenshot, delta_encoder)
                             screenshot_taken = False
                         
                         # Gesture: Open Palm (Receive Screenshot)
-                        elif (index_tip < thumb_tip and middle_tip < thumb_tip and
-                              ring_tip < thumb_tip and pinky_tip < thumb_tip and not receiving_mode):
-                            receive_thread = start_receive_server()
-                            receive_thread.start()
+                        elif gesture == "receive":
+                            start_receive_server().start()
+                        metrics.mark("actions")
                             
                     except Exception as e:
                         print(f"Error processing hand landmarks: {e}")
                         continue
 
-            # Add status text and IP info to the frame
-            status_text = "Ready"
-            if screenshot_taken:
-                status_text = "Screenshot taken - Ready to send"
-            elif receiving_mode:
-                status_text = "Receiving mode active"
-            
-            cv2.putText(frame, status_text, (10, 30), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            if not headless:
+                # Add status text and IP info to the frame (only re-rendered on change)
+                state = sessions.state
+                status_text = "Ready"
+                if screenshot_taken:
+                    status_text = "Screenshot taken - Ready to send"
+                elif state.receiving:
+                    status_text = "Receiving mode active"
+                hud.set("status", status_text, (10, 30), 1, (0, 255, 0), 2)
             
-            # Display connection info
-            ip_text = f"Your IP: {get_ip_address()}"
-            partner_text = f"Partner: {partner_ip if partner_ip else 'Not set'}"
-            cv2.putText(frame, ip_text, (10, frame.shape[0] - 60), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
-            cv2.putText(frame, partner_text, (10, frame.shape[0] - 30), cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 1)
+                # Display connection info
+                hud.set("ip", f"Your IP: {local_ip.value}", (10, -60))
+                hud.set("partner", f"Partner: {', '.join(state.targets) or 'Not set'}", (10, -30))
+                if pending_pairing is not None:
+                    hud.set("pairing", f"Press 'y' to pair with {pending_pairing.ip}", (10, 60), 0.6, (0, 255, 255))
+                else:
+                    hud.clear("pairing")
+                viewer.draw(frame)
+                hud.draw(frame)
+                metrics.draw_panel(frame)
+                metrics.mark("draw")
             
-            cv2.imshow("AirShare - Gesture Recognition", frame)
+                cv2.imshow("AirShare - Gesture Recognition", frame)
+                if full_view is not None and full_view.done():
+                    if full_view.result() is not None:
+                        cv2.imshow("AirShare - Received screenshot", full_view.result())
+                    full_view = None
+
+            key, arg = read_key(controls)
+            metrics.mark("display")
 
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
+            if frames == 1:
+                first_frame = time.perf_counter() - STARTED - prompt_seconds
+                excluded = " (not counting the partner prompt)" if prompt_seconds else ""
+                print(f"🚀 First preview frame after {1000 * first_frame:.0f} ms{excluded}")
+                if startup_bench:
+                    loader.get(wait=True)
+                    print(f"FIRST_FRAME {first_frame:.4f} MODEL_READY {time.perf_counter() - STARTED - prompt_seconds:.4f}")
+                    break
+            if key == 'q':
                 break
-            elif key == ord('p'):
-                partner_ip = configure_partner_ip()
+            elif key == 'v' and not headless:
+                full_view = viewer.full()
+                if full_view is None:
+                    print("No screenshot received yet")
+            elif key == 'k':
+                show_pairing_code(local_ip.value, headless)
+            elif key == 'y' and pending_pairing is not None:
+                pair(pending_pairing, sessions, channel.peers if channel is not None else None, PORT)
+                pending_pairing = None
+            elif key == 'p':
+                local_ip.refresh()
+                if arg:
+                    configure_partner_ip(arg)
+                elif headless:
+                    print("Usage: p <partner ip>[,<partner ip>...]")
+                else:
+                    configure_partner_ip()
 
     except Exception as e:
         print(f"Unexpected error: {e}")
     
     finally:
         print("\nCleaning up...")
+        wall = time.perf_counter() - wall_start
+        cpu = time.process_time() - cpu_start
+        if wall > 0:
+            print(f"📊 {frames} frames in {wall:.1f}s ({frames / wall:.1f} FPS), CPU {100 * cpu / wall:.0f}%")
+        sessions.report()
         cap.release()
-        cv2.destroyAllWindows()
+        capturer.shutdown()
+        scanner.shutdown()
+        if not headless:
+            cv2.destroyAllWindows()
 
 if __name__ == "__main__":
-    detect_gestures()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="AirShare screenshot gestures")
+    parser.add_argument("--headless", action="store_true", help="no preview window or drawing")
+    parser.add_argument("--control-port", type=int, help="localhost port for headless commands")
+    parser.add_argument("--partner", help="partner IP, or several comma separated (skips the prompt)")
+    parser.add_argument("--startup-bench", action="store_true", help="exit after the first preview frame")
+    parser.add_argument("--camera-profile", choices=sorted(CAPTURE_PROFILES), default=DEFAULT_PROFILE,
+                        help="capture format/resolution/buffering (see camera.py)")
+    parser.add_argument("--codec", choices=sorted(CODECS), default=DEFAULT_CODEC,
+                        help="screenshot encoding (see bench_screencap.py)")
+    parser.add_argument("--quality", type=int,
+                        help="PNG compression level or JPEG/WebP quality (codec default if omitted)")
+    parser.add_argument("--delta", action="store_true",
+                        help="only send tiles changed since the partner's last screenshot")
+    parser.add_argument("--secure", action="store_true",
+                        help="encrypt and authenticate transfers with paired peers (see secure.py)")
+    stage_metrics.add_arguments(parser)
+    args = parser.parse_args()
+    detect_gestures(headless=args.headless, control_port=args.control_port,
+                    metrics=stage_metrics.from_args(args),
+                    partner=args.partner, startup_bench=args.startup_bench,
+                    camera_profile=args.camera_profile, codec=args.codec, quality=args.quality,
+                    delta=args.delta, secure=args.secure)
\ No newline at end of file
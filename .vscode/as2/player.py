@@ -0,0 +1,106 @@
+"""Frame-paced video playback with a decode-ahead thread.
+
+A decoder thread keeps a small queue of frames ready, so an expensive frame
+does not hold up display. Frames are shown at their presentation time
+(frame index / CAP_PROP_FPS on a monotonic clock); a frame that is already
+more than one interval late is dropped instead of letting playback drift.
+When the decoder itself runs dry (e.g. a progressive download waiting for
+data) the clock is rebased rather than dropping everything that follows.
+"""
+
+import queue
+import threading
+import time
+
+import cv2
+
+QUEUE_SIZE = 8
+_END = object()
+
+
+class Player:
+    """Plays a VideoCapture-like source in an OpenCV window"""
+
+    def __init__(self, cap, window="Received Video", queue_size=QUEUE_SIZE):
+        self.cap = cap
+        self.window = window
+        self.fps = cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frames = queue.Queue(maxsize=queue_size)
+        self.stopped = threading.Event()
+        self.decoded = 0
+        self.decode_seconds = 0.0
+        self.shown = 0
+        self.dropped = 0
+        self.stalls = 0
+
+    def _decode(self):
+        index = 0
+        try:
+            while not self.stopped.is_set():
+                start = time.perf_counter()
+                ret, frame = self.cap.read()
+                self.decode_seconds += time.perf_counter() - start
+                if not ret:
+                    break
+                self.decoded += 1
+                self._put((index, frame))
+                index += 1
+        except Exception as e:
+            # e.g. cv2.error on a truncated file: end playback instead of hanging play()
+            print(f"⚠️ Decoding stopped: {e}")
+        finally:
+            self.cap.release()
+            self._put(_END)
+
+    def _put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.frames.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def play(self):
+        """Play until the end of the clip or 'q'; returns the stats line"""
+        decoder = threading.Thread(target=self._decode, daemon=True)
+        decoder.start()
+        interval = 1.0 / self.fps
+        clock = None
+        try:
+            while True:
+                try:
+                    item = self.frames.get_nowait()
+                    stalled = False
+                except queue.Empty:
+                    item = self.frames.get()
+                    stalled = True
+                if item is _END:
+                    break
+                index, frame = item
+                now = time.monotonic()
+                if clock is None:
+                    clock = now - index * interval
+                elif stalled and now > clock + (index + 1) * interval:
+                    # Late because the decoder ran dry, not the display: restart the timeline here
+                    self.stalls += 1
+                    clock = now - index * interval
+                due = clock + index * interval
+                if now > due + interval:
+                    self.dropped += 1
+                    continue
+                delay = due - time.monotonic()
+                if delay > 0:
+                    time.sleep(delay)
+                cv2.imshow(self.window, frame)
+                self.shown += 1
+                if cv2.waitKey(1) & 0xFF == ord('q'):
+                    break
+        finally:
+            self.stopped.set()
+            decoder.join(timeout=1)
+        return self.stats()
+
+    def stats(self):
+        decode_fps = self.decoded / self.decode_seconds if self.decode_seconds else 0.0
+        return (f"🎞️ {self.shown} frames shown at {self.fps:.0f} FPS, {self.dropped} dropped late, "
+                f"{self.stalls} decoder stalls, decode {decode_fps:.0f} FPS")
@@ -0,0 +1,168 @@
+"""Progressive playback of videos that are still being received.
+
+Sender side: an MP4/MOV whose index (moov) sits after the media data cannot
+be decoded until the very last byte arrives, so make_streamable() remuxes it
+to fragmented MP4 with ffmpeg (stream copy, no re-encode) when ffmpeg is on
+PATH. Containers with their headers up front (AVI, MKV, WebM, fast-start MP4)
+are sent as they are.
+
+Receiver side: GrowingFile tracks how much of the file has been written and
+ProgressiveCapture reads frames from it, staying AHEAD_SECONDS of playback
+(estimated from the clip's byte rate) behind the write offset. If the decoder
+still runs into the end of the data it waits for more and reopens at the
+same frame.
+"""
+
+import os
+import shutil
+import struct
+import subprocess
+import tempfile
+import threading
+
+import cv2
+
+FFMPEG = shutil.which("ffmpeg")
+PREBUFFER_SECONDS = 1.0
+AHEAD_SECONDS = 1.0
+MARGIN_BYTES = 256 * 1024
+REOPEN_BYTES = 512 * 1024
+
+
+def moov_before_mdat(path):
+    """True if an MP4/MOV has its moov box before the media data"""
+    with open(path, "rb") as f:
+        while True:
+            header = f.read(8)
+            if len(header) < 8:
+                return False
+            size, kind = struct.unpack(">I4s", header)
+            if size == 1:
+                size = struct.unpack(">Q", f.read(8))[0] - 8
+            elif size == 0:
+                return False
+            if kind == b"moov":
+                return True
+            if kind == b"mdat":
+                return False
+            f.seek(size - 8, os.SEEK_CUR)
+
+
+def make_streamable(path):
+    """(path to send, streamable, temporary file to delete afterwards or None)"""
+    if os.path.splitext(path)[1].lower() not in (".mp4", ".mov", ".m4v"):
+        return path, True, None
+    try:
+        if moov_before_mdat(path):
+            return path, True, None
+    except OSError:
+        return path, False, None
+    if FFMPEG is None:
+        print("ℹ️ ffmpeg not found: the receiver will play the video after the transfer")
+        return path, False, None
+    fd, out = tempfile.mkstemp(suffix=".mp4")
+    os.close(fd)
+    # -nostdin/DEVNULL: ffmpeg must not read the app's stdin (headless commands)
+    result = subprocess.run([FFMPEG, "-nostdin", "-v", "error", "-y", "-i", path, "-c", "copy", "-movflags",
+                             "frag_keyframe+empty_moov+default_base_moof", "-f", "mp4", out],
+                            stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        print(f"⚠️ Could not remux for streaming: {result.stderr.decode(errors='replace').strip()}")
+        os.remove(out)
+        return path, False, None
+    return out, True, out
+
+
+def probe_duration(path):
+    """Duration in seconds from the container, 0.0 if unknown"""
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        return frames / fps if fps > 0 and frames > 0 else 0.0
+    finally:
+        cap.release()
+
+
+class GrowingFile:
+    """A file being written by the receiver; readers can wait for bytes"""
+
+    def __init__(self, path, size):
+        self.path = path
+        self.size = size
+        self.written = 0
+        self.complete = False
+        self._file = open(path, "wb")
+        self._cond = threading.Condition()
+
+    def write(self, chunk):
+        self._file.write(chunk)
+        self._file.flush()
+        with self._cond:
+            self.written += len(chunk)
+            self._cond.notify_all()
+
+    def close(self):
+        self._file.close()
+        with self._cond:
+            self.complete = True
+            self._cond.notify_all()
+
+    def wait_for(self, offset, timeout=None):
+        """Block until offset bytes are on disk or the transfer ended"""
+        with self._cond:
+            return self._cond.wait_for(lambda: self.complete or self.written >= min(offset, self.size),
+                                       timeout)
+
+
+class ProgressiveCapture:
+    """VideoCapture-like reader over a GrowingFile"""
+
+    def __init__(self, incoming, duration):
+        self.incoming = incoming
+        self.byte_rate = incoming.size / duration if duration > 0 else None
+        incoming.wait_for(self._needed(PREBUFFER_SECONDS))
+        self.cap = None
+        self._open()
+        while not self.cap.isOpened() and not incoming.complete:
+            # Not even the container header is readable yet
+            incoming.wait_for(incoming.written + REOPEN_BYTES)
+            self._open()
+        self.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
+        self.frames = 0
+
+    def _open(self):
+        if self.cap is not None:
+            self.cap.release()
+        self.opened_at = self.incoming.written
+        self.cap = cv2.VideoCapture(self.incoming.path)
+
+    def _needed(self, seconds):
+        if self.byte_rate is None:
+            return self.incoming.size  # unknown rate: wait for everything
+        return int(seconds * self.byte_rate) + MARGIN_BYTES
+
+    def isOpened(self):
+        return self.cap.isOpened()
+
+    def get(self, prop):
+        return self.cap.get(prop)
+
+    def read(self):
+        self.incoming.wait_for(self._needed(self.frames / self.fps + AHEAD_SECONDS))
+        ret, frame = self.cap.read()
+        while not ret:
+            # The decoder reached the end of the data: wait for more, resume at this frame
+            if not self.incoming.complete:
+                self.incoming.wait_for(self.incoming.written + REOPEN_BYTES)
+            elif self.opened_at >= self.incoming.written:
+                break  # the real end of the clip
+            self._open()
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, self.frames)
+            ret, frame = self.cap.read()
+        if ret:
+            self.frames += 1
+        return ret, frame
+
+    def release(self):
+        self.cap.release()
@@ -0,0 +1,245 @@
+"""Offline replay and benchmark for the gesture detection path.
+
+Feeds recorded clips (.mp4/.mov/.avi) or landmark streams (.jsonl) through
+the same flip -> BGR2RGB -> hands.process() -> gesture rules path the camera
+scripts use, without needing a webcam.
+
+    python replay.py clip.mp4 --mode pdf
+    python replay.py clip.mp4 --record clip.jsonl      # save landmarks once
+    python replay.py clip.jsonl --mode pic --json out.json
+    python replay.py clip.jsonl --baseline out.json     # fail on FPS regression
+
+Labels come from ``<clip>.labels.json`` (a list of
+``{"start": frame, "end": frame, "gesture": name}``, end inclusive) or, for
+landmark streams, from a ``"label"`` key on each line.
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from collections import namedtuple
+
+import gestures
+
+Point = namedtuple("Point", "x y z")
+
+STAGES = ("read", "process", "classify")
+
+
+def load_labels(path):
+    """Frame index -> gesture name from the sidecar labels file, if any"""
+    labels_path = os.path.splitext(path)[0] + ".labels.json"
+    if not os.path.exists(labels_path):
+        return {}
+    with open(labels_path) as f:
+        segments = json.load(f)
+    labels = {}
+    for seg in segments:
+        for i in range(seg["start"], seg["end"] + 1):
+            labels[i] = seg["gesture"]
+    return labels
+
+
+def video_frames(path, timings):
+    """(index, hands, label) per frame of a clip, running MediaPipe on each frame.
+
+    The model is loaded and the clip opened here, not on the first next(), so
+    the replay clocks only cover the per-frame work.
+    """
+    import cv2
+    import mediapipe as mp
+
+    hands = mp.solutions.hands.Hands(min_detection_confidence=0.7,
+                                     min_tracking_confidence=0.7)
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        hands.close()
+        raise IOError(f"Could not open video: {path}")
+    return _process_frames(cap, hands, timings)
+
+
+def _process_frames(cap, hands, timings):
+    from framebuf import FramePool
+
+    pool = FramePool()
+    index = 0
+    try:
+        while True:
+            t0 = time.perf_counter()
+            ret, frame, rgb_frame = pool.read(cap)
+            t1 = time.perf_counter()
+            if not ret:
+                break
+            results = hands.process(rgb_frame)
+            t2 = time.perf_counter()
+            timings["read"].append(t1 - t0)  # read + flip + convert
+            timings["process"].append(t2 - t1)
+            found = [h.landmark for h in results.multi_hand_landmarks or []]
+            yield index, found, None
+            index += 1
+    finally:
+        cap.release()
+        hands.close()
+
+
+def landmark_frames(path, timings):
+    """Yield (index, hands, label) from a recorded .jsonl landmark stream"""
+    with open(path) as f:
+        for index, line in enumerate(f):
+            t0 = time.perf_counter()
+            record = json.loads(line)
+            found = [[Point(*p) for p in hand] for hand in record.get("hands", [])]
+            timings["read"].append(time.perf_counter() - t0)
+            yield record.get("frame", index), found, record.get("label")
+
+
+def record_landmarks(path, out_path):
+    """Run MediaPipe over a clip once and save the landmarks as .jsonl"""
+    timings = {stage: [] for stage in STAGES}
+    labels = load_labels(path)
+    count = 0
+    with open(out_path, "w") as out:
+        for index, found, _ in video_frames(path, timings):
+            record = {"frame": index,
+                      "hands": [[[p.x, p.y, p.z] for p in hand] for hand in found]}
+            if index in labels:
+                record["label"] = labels[index]
+            out.write(json.dumps(record) + "\n")
+            count += 1
+    print(f"💾 Saved {count} frames of landmarks to {out_path}")
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    k = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[k]
+
+
+def replay(path, mode):
+    """Replay one clip and return a report dict"""
+    timings = {stage: [] for stage in STAGES}
+    labels = load_labels(path)
+    names = gestures.GESTURES[mode]
+    counts = {name: {"tp": 0, "fp": 0, "fn": 0} for name in names}
+
+    if path.endswith(".jsonl"):
+        frames = landmark_frames(path, timings)
+    else:
+        frames = video_frames(path, timings)
+
+    cpu_start = time.process_time()
+    wall_start = time.perf_counter()
+    total = 0
+    for index, found, label in frames:
+        t0 = time.perf_counter()
+        predicted = set()
+        for landmarks in found:
+            predicted |= gestures.classify(mode, landmarks)
+        timings["classify"].append(time.perf_counter() - t0)
+
+        label = label or labels.get(index)
+        for name in names:
+            if name in predicted:
+                counts[name]["tp" if label == name else "fp"] += 1
+            elif label == name:
+                counts[name]["fn"] += 1
+        total += 1
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+
+    report = {
+        "clip": os.path.basename(path),
+        "mode": mode,
+        "frames": total,
+        "fps": total / wall if wall else 0.0,
+        "cpu_seconds": cpu,
+        "wall_seconds": wall,
+        "stages_ms": {},
+        "gestures": {},
+    }
+    for stage, values in timings.items():
+        if values:
+            report["stages_ms"][stage] = {
+                "mean": 1000 * sum(values) / len(values),
+                "p50": 1000 * percentile(values, 50),
+                "p95": 1000 * percentile(values, 95),
+            }
+    for name, c in counts.items():
+        predicted_total = c["tp"] + c["fp"]
+        actual_total = c["tp"] + c["fn"]
+        report["gestures"][name] = {
+            "precision": c["tp"] / predicted_total if predicted_total else None,
+            "recall": c["tp"] / actual_total if actual_total else None,
+            **c,
+        }
+    return report
+
+
+def print_report(report):
+    print(f"\n🎞️  {report['clip']} ({report['mode']}): {report['frames']} frames, "
+          f"{report['fps']:.1f} FPS, {report['cpu_seconds']:.2f}s CPU")
+    for stage, s in report["stages_ms"].items():
+        print(f"   {stage:<9} mean {s['mean']:7.3f} ms   p50 {s['p50']:7.3f} ms   p95 {s['p95']:7.3f} ms")
+    for name, g in report["gestures"].items():
+        precision = "-" if g["precision"] is None else f"{g['precision']:.2f}"
+        recall = "-" if g["recall"] is None else f"{g['recall']:.2f}"
+        print(f"   {name:<12} precision {precision:>5}   recall {recall:>5}")
+
+
+def check_baseline(reports, baseline_path, tolerance):
+    """Return a list of regressions against a previous --json run"""
+    with open(baseline_path) as f:
+        baseline = {r["clip"]: r for r in json.load(f)}
+    problems = []
+    for report in reports:
+        base = baseline.get(report["clip"])
+        if not base:
+            continue
+        if report["fps"] < base["fps"] * (1 - tolerance):
+            problems.append(f"{report['clip']}: FPS {report['fps']:.1f} < baseline {base['fps']:.1f}")
+        for name, g in report["gestures"].items():
+            old = base["gestures"].get(name, {})
+            for metric in ("precision", "recall"):
+                if g[metric] is not None and old.get(metric) is not None and g[metric] < old[metric]:
+                    problems.append(f"{report['clip']}: {name} {metric} {g[metric]:.2f} < baseline {old[metric]:.2f}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded clips through the gesture detection path")
+    parser.add_argument("clips", nargs="+", help="video files or .jsonl landmark streams")
+    parser.add_argument("--mode", choices=sorted(gestures.GESTURES), default="pdf")
+    parser.add_argument("--record", metavar="OUT", help="save landmarks of a single clip as .jsonl and exit")
+    parser.add_argument("--json", metavar="OUT", help="write the reports to a JSON file")
+    parser.add_argument("--baseline", help="previous --json output to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.1, help="allowed FPS drop vs baseline (default 0.1)")
+    args = parser.parse_args()
+
+    if args.record:
+        record_landmarks(args.clips[0], args.record)
+        return 0
+
+    reports = [replay(path, args.mode) for path in args.clips]
+    for report in reports:
+        print_report(report)
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(reports, f, indent=2)
+
+    if args.baseline:
+        problems = check_baseline(reports, args.baseline, args.tolerance)
+        for problem in problems:
+            print(f"❌ {problem}")
+        if problems:
+            return 1
+        print("\n✅ No regressions against baseline")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
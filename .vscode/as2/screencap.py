@@ -0,0 +1,88 @@
+"""In-memory screenshots, encoded off the camera thread.
+
+The screen is grabbed straight into a NumPy array (mss when installed,
+pyautogui otherwise) and encoded with cv2.imencode on a single worker thread,
+so the gesture loop never waits for PNG compression. The encoded bytes are
+sent from memory; nothing is written to disk.
+
+Codecs: png (fast compression level by default), jpeg and webp.
+"""
+
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+# codec -> (extension, imencode quality flag, default quality)
+CODECS = {
+    "png": (".png", cv2.IMWRITE_PNG_COMPRESSION, 1),
+    "jpeg": (".jpg", cv2.IMWRITE_JPEG_QUALITY, 90),
+    "webp": (".webp", cv2.IMWRITE_WEBP_QUALITY, 90),
+}
+DEFAULT_CODEC = "png"
+EXTENSIONS = {ext for ext, _, _ in CODECS.values()}
+
+
+class Screenshot:
+    """Encoded screenshot bytes plus the BGR pixels they came from"""
+
+    def __init__(self, image, data, ext, capture_seconds, encode_seconds):
+        self.image = image
+        self.data = data
+        self.ext = ext
+        self.capture_seconds = capture_seconds
+        self.encode_seconds = encode_seconds
+
+    def describe(self):
+        return (f"{self.ext[1:]} {len(self.data) / 1024:.0f} KiB, capture {1000 * self.capture_seconds:.0f} ms, "
+                f"encode {1000 * self.encode_seconds:.0f} ms")
+
+
+def encode(image, codec=DEFAULT_CODEC, quality=None):
+    """Encode a BGR image; returns (bytes, extension)"""
+    ext, flag, default = CODECS[codec]
+    ok, buf = cv2.imencode(ext, image, [flag, default if quality is None else quality])
+    if not ok:
+        raise ValueError(f"Could not encode screenshot as {codec}")
+    return buf.tobytes(), ext
+
+
+class ScreenCapturer:
+    """Grabs and encodes screenshots on one worker thread.
+
+    mss handles are tied to the thread that created them, so the grabber is
+    created lazily on the worker and reused for every capture.
+    """
+
+    def __init__(self, codec=DEFAULT_CODEC, quality=None):
+        self.codec = codec
+        self.quality = quality
+        self._sct = None
+        self._worker = ThreadPoolExecutor(max_workers=1)
+
+    def capture(self):
+        """Start a capture; returns a Future of a Screenshot"""
+        return self._worker.submit(self._capture)
+
+    def grab(self):
+        """The primary screen as a BGR array"""
+        try:
+            if self._sct is None:
+                import mss
+                self._sct = mss.mss()
+            shot = self._sct.grab(self._sct.monitors[1])
+            return cv2.cvtColor(np.asarray(shot), cv2.COLOR_BGRA2BGR)
+        except ImportError:
+            import pyautogui
+            return cv2.cvtColor(np.asarray(pyautogui.screenshot()), cv2.COLOR_RGB2BGR)
+
+    def _capture(self):
+        start = time.perf_counter()
+        image = self.grab()
+        grabbed = time.perf_counter()
+        data, ext = encode(image, self.codec, self.quality)
+        return Screenshot(image, data, ext, grabbed - start, time.perf_counter() - grabbed)
+
+    def shutdown(self):
+        self._worker.shutdown(wait=False)
@@ -0,0 +1,208 @@
+"""Authenticated, encrypted TCP transport (TLS 1.3) keyed from pairing.
+
+Every device has an identity in ~/.airshare/tls: a self-signed EC
+certificate and a random pairing secret. Pairing with a device means storing
+its certificate fingerprint and secret in ~/.airshare/peers.json:
+
+    python secure.py                                 # this device's pairing info
+    python secure.py pair <ip> <fingerprint> <secret>
+
+A connection is TLS 1.3; the client only accepts the server whose
+certificate matches the pinned fingerprint (no CA involved). The server then
+sends a random nonce and the client must answer
+HMAC-SHA256(server secret, nonce + fingerprint), so only paired devices get
+in. After that the socket carries the usual plaintext protocol unchanged.
+
+Reconnects resume the TLS session from the last connection's ticket, which
+skips the certificate exchange and signature. Encryption itself runs in
+OpenSSL (AES-GCM) with the GIL released, on whatever thread calls sendall(),
+over the transports' existing large writes; see bench_secure.py.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import shutil
+import socket
+import ssl
+import subprocess
+import sys
+import threading
+
+TLS_DIR = os.path.expanduser("~/.airshare/tls")
+PEERS_PATH = os.path.expanduser("~/.airshare/peers.json")
+NONCE_SIZE = 32
+HANDSHAKE_TIMEOUT = 10
+
+
+def fingerprint(der):
+    return hashlib.sha256(der).hexdigest()
+
+
+def _answer(secret, nonce, server_fingerprint):
+    return hmac.new(bytes.fromhex(secret), nonce + bytes.fromhex(server_fingerprint), hashlib.sha256).digest()
+
+
+def create_certificate(cert_path, key_path):
+    """Self-signed P-256 certificate via the openssl CLI or, failing that, cryptography"""
+    openssl = shutil.which("openssl")
+    if openssl:
+        subprocess.run([openssl, "req", "-x509", "-newkey", "ec", "-pkeyopt", "ec_paramgen_curve:prime256v1",
+                        "-nodes", "-keyout", key_path, "-out", cert_path, "-days", "3650",
+                        "-subj", "/CN=airshare"], check=True, capture_output=True)
+        return
+    try:
+        import datetime
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes, serialization
+        from cryptography.hazmat.primitives.asymmetric import ec
+        from cryptography.x509.oid import NameOID
+    except ImportError:
+        raise RuntimeError("Creating a TLS identity needs the openssl command or 'pip install cryptography'")
+    key = ec.generate_private_key(ec.SECP256R1())
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "airshare")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (x509.CertificateBuilder().subject_name(name).issuer_name(name).public_key(key.public_key())
+            .serial_number(x509.random_serial_number()).not_valid_before(now)
+            .not_valid_after(now + datetime.timedelta(days=3650)).sign(key, hashes.SHA256()))
+    with open(key_path, "wb") as f:
+        f.write(key.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+                                  serialization.NoEncryption()))
+    with open(cert_path, "wb") as f:
+        f.write(cert.public_bytes(serialization.Encoding.PEM))
+
+
+class Identity:
+    """This device's certificate, key and pairing secret (created on first use)"""
+
+    def __init__(self, directory=TLS_DIR):
+        self.cert_path = os.path.join(directory, "cert.pem")
+        self.key_path = os.path.join(directory, "key.pem")
+        secret_path = os.path.join(directory, "secret")
+        if not os.path.exists(self.cert_path):
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+            create_certificate(self.cert_path, self.key_path)
+            os.chmod(self.key_path, 0o600)
+        if not os.path.exists(secret_path):
+            fd = os.open(secret_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w") as f:
+                f.write(secrets.token_hex(16))
+        with open(secret_path) as f:
+            self.secret = f.read().strip()
+        with open(self.cert_path) as f:
+            self.fingerprint = fingerprint(ssl.PEM_cert_to_DER_cert(f.read()))
+
+
+class PeerStore:
+    """Pinned fingerprint and pairing secret per peer address"""
+
+    def __init__(self, path=PEERS_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path) as f:
+                self.peers = json.load(f)
+        except (OSError, ValueError):
+            self.peers = {}
+
+    def get(self, peer):
+        return self.peers.get(peer)
+
+    def pair(self, peer, peer_fingerprint, secret):
+        with self._lock:
+            self.peers[peer] = {"fingerprint": peer_fingerprint.lower(), "secret": secret.lower()}
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            fd = os.open(self.path + ".tmp", os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+            with os.fdopen(fd, "w") as f:
+                json.dump(self.peers, f, indent=2)
+            os.replace(self.path + ".tmp", self.path)
+
+
+def recv_exact(conn, n):
+    buf = bytearray()
+    while len(buf) < n:
+        data = conn.recv(n - len(buf))
+        if not data:
+            raise ConnectionError("Connection closed during the handshake")
+        buf += data
+    return bytes(buf)
+
+
+class SecureChannel:
+    """Wraps plain TCP sockets in pinned, mutually authenticated TLS"""
+
+    def __init__(self, identity=None, peers=None):
+        self.identity = identity or Identity()
+        self.peers = peers or PeerStore()
+        self.server_context = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        self.server_context.minimum_version = ssl.TLSVersion.TLSv1_3
+        self.server_context.load_cert_chain(self.identity.cert_path, self.identity.key_path)
+        # The peer's certificate is checked against the pinned fingerprint instead of a CA
+        self.client_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.client_context.minimum_version = ssl.TLSVersion.TLSv1_3
+        self.client_context.check_hostname = False
+        self.client_context.verify_mode = ssl.CERT_NONE
+        self._tickets = {}  # (host, port) -> ssl.SSLSession of the last connection
+
+    def connect(self, host, port, timeout=None):
+        """Connected, authenticated TLS socket to a paired peer"""
+        peer = self.peers.get(host)
+        if peer is None:
+            raise PermissionError(f"Not paired with {host} (see 'python secure.py pair')")
+        raw = socket.create_connection((host, port), timeout=timeout)
+        raw.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        try:
+            conn = self.client_context.wrap_socket(raw, session=self._tickets.get((host, port)))
+        except BaseException:
+            raw.close()
+            raise
+        try:
+            if fingerprint(conn.getpeercert(binary_form=True)) != peer["fingerprint"]:
+                raise PermissionError(f"{host} presented an unknown certificate")
+            nonce = recv_exact(conn, NONCE_SIZE)
+            conn.sendall(_answer(peer["secret"], nonce, peer["fingerprint"]))
+            self._tickets[(host, port)] = conn.session
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+    def accept(self, conn):
+        """Server side of the handshake on an accepted socket; raises if the peer is not paired"""
+        conn.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        timeout = conn.gettimeout()
+        conn.settimeout(HANDSHAKE_TIMEOUT)  # a stalled peer must not block the accept loop
+        conn = self.server_context.wrap_socket(conn, server_side=True)
+        try:
+            nonce = secrets.token_bytes(NONCE_SIZE)
+            conn.sendall(nonce)
+            expected = _answer(self.identity.secret, nonce, self.identity.fingerprint)
+            if not hmac.compare_digest(recv_exact(conn, len(expected)), expected):
+                raise PermissionError("Peer does not know the pairing secret")
+            conn.settimeout(timeout)
+        except BaseException:
+            conn.close()
+            raise
+        return conn
+
+
+def open_connection(host, port, timeout=None, channel=None):
+    """TCP connection to host:port, through channel (a SecureChannel) when given"""
+    if channel is not None:
+        return channel.connect(host, port, timeout)
+    return socket.create_connection((host, port), timeout=timeout)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == "pair":
+        PeerStore().pair(*sys.argv[2:])
+        print(f"🔐 Paired with {sys.argv[2]}")
+    elif len(sys.argv) == 1:
+        identity = Identity()
+        print(f"Fingerprint: {identity.fingerprint}")
+        print(f"Secret:      {identity.secret}")
+        print(f"On the other device: python secure.py pair <this ip> {identity.fingerprint} {identity.secret}")
+    else:
+        print("Usage: python secure.py [pair <ip> <fingerprint> <secret>]")
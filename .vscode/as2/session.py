@@ -0,0 +1,170 @@
+"""Thread-safe registry of peers, transfers and shared app state.
+
+The camera loop reads the partner list, receive mode and selection on every
+frame, while receive servers and send threads change them. Instead of module
+globals, that state lives in an immutable State snapshot: writers build a new
+snapshot under a lock and swap it in, readers just load `registry.state`
+(one attribute read, no lock) and get a consistent view of all fields.
+
+Each peer has a Session with its own counters; transfers to or from it are
+wrapped in `registry.transfer(peer, direction)`, which tracks how many are in
+flight and adds bytes/time on success or an error otherwise. Any number of
+peers and concurrent transfers can be active. With a TransferLog each
+finished transfer is also written as a JSONL record (see telemetry.py).
+"""
+
+import os
+import threading
+import time
+from collections import namedtuple
+
+from telemetry import Progress
+
+State = namedtuple("State", "sessions targets receiving selected received_id")
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if n < 1024:
+            return f"{n:.0f} {unit}"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+class Transfer:
+    """One send or receive; call done(nbytes) when it succeeded"""
+
+    def __init__(self, session, direction, name=None, chunk_size=None, log=None):
+        self.session = session
+        self.direction = direction
+        self.name = name
+        self.chunk_size = chunk_size
+        self.log = log
+        self.started = time.monotonic()
+        self.nbytes = None
+        self.retries = 0
+        self.first_byte = None
+        self.progress = None
+
+    def done(self, nbytes):
+        self.nbytes = nbytes
+
+    def mark_first_byte(self):
+        """Data starts flowing now (for transfers without a Progress)"""
+        if self.first_byte is None:
+            self.first_byte = time.monotonic() - self.started
+
+    def track(self, label, total, approximate=False):
+        """Rate-limited progress line whose curve goes into the record"""
+        self.progress = Progress(label, total, approximate, started=self.started)
+        return self.progress
+
+    def __enter__(self):
+        self.session._begin()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.monotonic() - self.started
+        self.session._end(self, seconds)
+        if self.log is not None:
+            self.log.write(self.record(seconds, exc))
+        return False
+
+    def record(self, seconds, exc=None):
+        progress = self.progress
+        first_byte = self.first_byte if progress is None else progress.first_byte
+        return {"peer": self.session.peer, "direction": self.direction,
+                "name": os.path.basename(self.name) if self.name else None,
+                "type": os.path.splitext(self.name or "")[1].lower() or None,
+                "ok": self.nbytes is not None, "error": str(exc) if exc else None,
+                "bytes": self.nbytes if self.nbytes is not None else (progress.done if progress else 0),
+                "seconds": round(seconds, 4),
+                "first_byte": round(first_byte, 4) if first_byte is not None else None,
+                "retries": self.retries, "chunk_size": self.chunk_size,
+                "curve": progress.curve if progress else []}
+
+
+class Session:
+    """A peer and its transfer statistics"""
+
+    def __init__(self, peer):
+        self.peer = peer
+        self.started = time.time()
+        self.active = 0
+        self.files = {"send": 0, "receive": 0}
+        self.bytes = {"send": 0, "receive": 0}
+        self.seconds = {"send": 0.0, "receive": 0.0}
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def _begin(self):
+        with self._lock:
+            self.active += 1
+
+    def _end(self, transfer, seconds):
+        with self._lock:
+            self.active -= 1
+            if transfer.nbytes is None:
+                self.errors += 1
+                return
+            self.files[transfer.direction] += 1
+            self.bytes[transfer.direction] += transfer.nbytes
+            self.seconds[transfer.direction] += seconds
+
+    def rate(self, direction):
+        """Average throughput (bytes/s) of completed transfers, or 0"""
+        seconds = self.seconds[direction]
+        return self.bytes[direction] / seconds if seconds else 0.0
+
+    def describe(self):
+        text = (f"{self.peer}: sent {self.files['send']} ({format_bytes(self.bytes['send'])}), "
+                f"received {self.files['receive']} ({format_bytes(self.bytes['receive'])})")
+        if self.errors:
+            text += f", {self.errors} failed"
+        if self.active:
+            text += f", {self.active} active"
+        return text
+
+
+class SessionRegistry:
+    """Peers by address plus shared state; see the module docstring"""
+
+    def __init__(self, log=None):
+        self.log = log  # telemetry.TransferLog for per-transfer records, or None
+        self._lock = threading.Lock()
+        self.state = State(sessions={}, targets=(), receiving=False, selected=None, received_id=None)
+
+    def update(self, **changes):
+        """Swap in a copy of the state with changes applied"""
+        with self._lock:
+            self.state = self.state._replace(**changes)
+
+    def session(self, peer):
+        """The Session for peer, created on first use"""
+        session = self.state.sessions.get(peer)
+        if session is not None:
+            return session
+        with self._lock:
+            session = self.state.sessions.get(peer)
+            if session is None:
+                session = Session(peer)
+                sessions = dict(self.state.sessions)
+                sessions[peer] = session
+                self.state = self.state._replace(sessions=sessions)
+            return session
+
+    def set_targets(self, peers):
+        """Peers that sends go to; accepts a list or a comma/space separated string"""
+        if isinstance(peers, str):
+            peers = peers.replace(",", " ").split()
+        for peer in peers:
+            self.session(peer)
+        self.update(targets=tuple(peers))
+        return self.state.targets
+
+    def transfer(self, peer, direction, name=None, chunk_size=None):
+        return Transfer(self.session(peer), direction, name, chunk_size, self.log)
+
+    def report(self):
+        for session in self.state.sessions.values():
+            print(f"📊 {session.describe()}")
@@ -0,0 +1,178 @@
+"""Speculative pre-connect and file prefetch for gesture-triggered sends.
+
+Normally a send pays for file discovery, open()/read() and
+websockets.connect() one after another, after the gesture is confirmed.
+SendSpeculator watches the per-frame gesture votes instead: as soon as the
+send gesture shows up it starts finding and reading the file and opening
+the peer connection (concurrently, on the NetLoop). When enough recent
+frames agree the send is committed on the already-open connection; if the
+gesture fades first, the prefetch is cancelled and the connection closed.
+
+With tracing on (AIRSHARE_TRACE=1) each send also produces an end-to-end
+trace; see tracing.py.
+"""
+
+import asyncio
+import json
+import os
+from collections import deque
+
+import websockets
+
+import tracing
+
+
+class PreparedSend:
+    """A resolved file, its bytes and an open connection to the peer"""
+
+    def __init__(self, path, data, ws):
+        self.path = path
+        self.data = data
+        self.ws = ws
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+async def prepare_send(resolve_file, uri, trace=None):
+    """Find and read the file while connecting; None if there is no file"""
+    loop = asyncio.get_running_loop()
+
+    async def load():
+        start = tracing.now_us()
+        path = await loop.run_in_executor(None, resolve_file)
+        resolved = tracing.now_us()
+        if trace:
+            trace.span("resolve file", start, resolved, path=path)
+        if not path or not os.path.exists(path):
+            return None, None
+        data = await loop.run_in_executor(None, read_file, path)
+        if trace:
+            trace.span("read file", resolved, tracing.now_us(), bytes=len(data))
+        return path, data
+
+    async def open_connection():
+        start = tracing.now_us()
+        ws = await websockets.connect(uri, open_timeout=10)
+        if trace:
+            trace.span("connect", start, tracing.now_us(), uri=uri)
+        return ws
+
+    connect = asyncio.ensure_future(open_connection())
+    try:
+        path, data = await load()
+    except BaseException:
+        discard(connect)
+        raise
+    if path is None:
+        discard(connect)
+        return None
+    return PreparedSend(path, data, await connect)
+
+
+def discard(connect):
+    """Cancel a pending connect, or close it if it already succeeded"""
+    if not connect.done():
+        connect.cancel()
+    elif not connect.cancelled() and connect.exception() is None:
+        asyncio.ensure_future(connect.result().close())
+
+
+async def close_prepared(task):
+    try:
+        prepared = await asyncio.wrap_future(task)
+    except BaseException:
+        return
+    if prepared is not None:
+        await prepared.ws.close()
+
+
+class SendSpeculator:
+    """Turns per-frame gesture votes into speculative prepare / commit / cancel.
+
+    The send starts being prepared once ``start_at`` of the last ``window``
+    frames showed the gesture and is committed at ``confirm_at``. After a
+    commit nothing new starts until the gesture has left the window entirely.
+    """
+
+    def __init__(self, net, resolve_file, uri, fallback=None, window=5, start_at=1, confirm_at=3):
+        self.net = net
+        self.resolve_file = resolve_file
+        self.uri = uri
+        self.fallback = fallback
+        self.votes = deque(maxlen=window)
+        self.start_at = start_at
+        self.confirm_at = confirm_at
+        self._task = None
+        self._trace = None
+        self._armed = True
+
+    def confidence(self):
+        return sum(self.votes) / self.votes.maxlen
+
+    def update(self, seen, captured_us=None):
+        """Feed one frame (captured at captured_us); returns the send future once confirmed"""
+        self.votes.append(bool(seen))
+        count = sum(self.votes)
+        if count == 0:
+            self._armed = True
+            self.cancel()
+        if not self._armed:
+            return None
+        if count >= self.start_at and self._task is None:
+            self._trace = tracing.Trace() if tracing.ENABLED else None
+            if self._trace:
+                self._trace.instant("gesture first seen", captured_us)
+            self._task = self.net.submit(prepare_send(self.resolve_file, self.uri, self._trace))
+        if count >= self.confirm_at:
+            self._armed = False
+            if self._trace:
+                self._trace.instant("gesture frame captured", captured_us)
+                self._trace.instant("gesture confirmed")
+            return self.commit()
+        return None
+
+    def commit(self):
+        task, self._task = self._task, None
+        trace, self._trace = self._trace, None
+        return self.net.submit(self._send(task, trace))
+
+    def cancel(self):
+        """Drop a speculative prepare; closes its connection if it was opened"""
+        task, self._task = self._task, None
+        self._trace = None
+        if task is not None:
+            task.cancel()
+            self.net.submit(close_prepared(task))
+
+    async def _send(self, task, trace=None):
+        loop = asyncio.get_running_loop()
+        try:
+            prepared = await asyncio.wrap_future(task) if task else None
+            if prepared is None and self.fallback:
+                # Nothing found speculatively: ask the user (off the loop thread)
+                path = await loop.run_in_executor(None, self.fallback)
+                if path and os.path.exists(path):
+                    prepared = PreparedSend(path, await loop.run_in_executor(None, read_file, path),
+                                            await websockets.connect(self.uri, open_timeout=10))
+            if prepared is None:
+                print("❌ No valid file found to send!")
+                return
+            print(f"📂 Sending file: {prepared.path}")
+            async with prepared.ws as websocket:
+                offset = await tracing.sync_clock(websocket, trace) if trace else 0
+                await websocket.send(os.path.basename(prepared.path))
+                if trace:
+                    trace.instant("first byte sent", bytes=len(prepared.data))
+                await websocket.send(prepared.data)
+                if trace:
+                    trace.instant("last byte sent")
+                    remote = await asyncio.wait_for(websocket.recv(), timeout=10)
+                    trace.add_remote(json.loads(remote), offset)
+            print("✅ File sent successfully!")
+            if trace:
+                print(f"🧭 Trace saved to {trace.save()}")
+        except Exception as e:
+            print(f"❌ Error sending file: {e}")
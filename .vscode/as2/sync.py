@@ -0,0 +1,149 @@
+"""Manifest-based "send everything changed since last share" sync.
+
+For each peer a manifest of what was last delivered (relative path -> size,
+mtime, hash) is kept in ~/.airshare/sync. A sync stats every file in the
+FileIndex, skips the ones whose size and mtime match the manifest and hashes
+the rest in parallel (BLAKE2b on a thread pool; hashlib releases the GIL on
+large buffers). Files whose hash still matches were only touched and are just
+re-stamped; the others are streamed to the peer as one batch:
+
+    "SYNC <count>", then <count> x (relative path, bytes), answered by "OK <count>"
+
+The manifest is only updated once the receiver has acknowledged the batch.
+Deleted files are not propagated.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+import websockets
+
+MANIFEST_DIR = os.path.expanduser("~/.airshare/sync")
+HASH_WORKERS = min(8, os.cpu_count() or 1)
+BLOCK_SIZE = 1 << 20
+
+
+def file_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(BLOCK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def safe_join(root, relpath):
+    """root/relpath, or None if relpath is absolute or would leave root"""
+    parts = relpath.replace("\\", "/").split("/")
+    if any(p in ("", ".", "..") or ":" in p for p in parts):
+        return None
+    return os.path.join(root, *parts)
+
+
+class Manifest:
+    """What was last delivered to one peer from one root"""
+
+    def __init__(self, peer, root, directory=MANIFEST_DIR):
+        name = re.sub(r"[^0-9A-Za-z.-]+", "_", peer)
+        tag = hashlib.sha1(os.path.abspath(root).encode()).hexdigest()[:8]
+        self.path = os.path.join(directory, f"{name}_{tag}.json")
+        try:
+            with open(self.path) as f:
+                self.entries = json.load(f)  # relpath -> [size, mtime_ns, hash]
+        except (OSError, ValueError):
+            self.entries = {}
+
+    def save(self):
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp = self.path + ".tmp"
+            with open(tmp, "w") as f:
+                json.dump(self.entries, f)
+            os.replace(tmp, self.path)
+        except OSError as e:
+            print(f"Could not save sync manifest: {e}")
+
+
+def changed_files(index, manifest, workers=HASH_WORKERS):
+    """(changed, touched) as lists of (relpath, path, [size, mtime_ns, hash])"""
+    candidates = []
+    for path in index.paths():
+        try:
+            st = os.stat(path)
+        except OSError:
+            continue
+        relpath = os.path.relpath(path, index.root).replace(os.sep, "/")
+        old = manifest.entries.get(relpath)
+        if old is None or old[:2] != [st.st_size, st.st_mtime_ns]:
+            candidates.append((relpath, path, st.st_size, st.st_mtime_ns))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = list(pool.map(lambda c: file_hash(c[1]), candidates))
+    changed, touched = [], []
+    for (relpath, path, size, mtime), digest in zip(candidates, digests):
+        old = manifest.entries.get(relpath)
+        entry = [size, mtime, digest]
+        (touched if old is not None and old[2] == digest else changed).append((relpath, path, entry))
+    return changed, touched
+
+
+class Syncer:
+    """Mirrors the files of a FileIndex to one peer"""
+
+    def __init__(self, index, peer, uri):
+        self.index = index
+        self.uri = uri
+        self.manifest = Manifest(peer, index.root)
+
+    async def sync(self):
+        loop = asyncio.get_running_loop()
+        try:
+            changed, touched = await loop.run_in_executor(None, changed_files, self.index, self.manifest)
+            self.manifest.entries.update((relpath, entry) for relpath, _, entry in touched)
+            if not changed:
+                self.manifest.save()
+                print(f"✅ Already in sync ({len(self.index)} files)")
+                return
+            print(f"🔄 Syncing {len(changed)} of {len(self.index)} files...")
+            sent = 0
+            async with websockets.connect(self.uri, open_timeout=10) as websocket:
+                await websocket.send(f"SYNC {len(changed)}")
+                for relpath, path, _ in changed:
+                    data = await loop.run_in_executor(None, read_file, path)
+                    await websocket.send(relpath)
+                    await websocket.send(data)
+                    sent += len(data)
+                reply = await asyncio.wait_for(websocket.recv(), timeout=30)
+            if reply != f"OK {len(changed)}":
+                raise ConnectionError(f"unexpected reply {reply!r}")
+            self.manifest.entries.update((relpath, entry) for relpath, _, entry in changed)
+            self.manifest.save()
+            print(f"✅ Synced {len(changed)} files ({sent / 1024:.1f} KB)")
+        except Exception as e:
+            print(f"❌ Sync failed: {e}")
+
+
+async def receive_sync(websocket, header, root):
+    """Write a "SYNC <count>" batch under root and acknowledge it"""
+    count = int(header.split()[1])
+    for _ in range(count):
+        relpath = await websocket.recv()
+        data = await websocket.recv()
+        save_path = safe_join(root, relpath)
+        if save_path is None:
+            print(f"⚠️ Refusing unsafe path: {relpath!r}")
+            continue
+        os.makedirs(os.path.dirname(save_path), exist_ok=True)
+        tmp = save_path + ".part"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, save_path)
+        print(f"📥 Synced: {relpath}")
+    await websocket.send(f"OK {count}")
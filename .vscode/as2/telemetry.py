@@ -0,0 +1,184 @@
+"""Transfer progress, per-transfer JSONL records and their offline analysis.
+
+Progress replaces per-chunk print(..., end="\\r") lines: it redraws at most
+every PRINT_INTERVAL and samples the throughput curve at the same moments.
+
+TransferLog appends one JSON object per finished transfer to a rotating log
+(~/.airshare/transfers.jsonl, plus .1 ... .N backups):
+
+    {"time", "app", "peer", "direction", "name", "type", "ok", "error",
+     "bytes", "seconds", "first_byte", "retries", "chunk_size", "curve"}
+
+first_byte is the seconds from the start of the transfer (connect, TLS,
+header) to its first progress update; curve is [[seconds, bytes], ...].
+Records are written by session.Transfer when the registry has a log.
+
+Summaries per peer and per file type:
+
+    python telemetry.py
+    python telemetry.py --by type --since 24
+"""
+
+import argparse
+import glob
+import json
+import logging
+import logging.handlers
+import os
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+LOG_PATH = os.path.expanduser("~/.airshare/transfers.jsonl")
+MAX_BYTES = 5 * 1024 * 1024
+BACKUPS = 5
+PRINT_INTERVAL = 0.5
+MAX_CURVE_POINTS = 120
+
+
+class Progress:
+    """Rate-limited progress line and throughput curve for one transfer"""
+
+    def __init__(self, label, total, approximate=False, started=None, interval=PRINT_INTERVAL,
+                 out=sys.stdout):
+        self.label = label
+        self.total = total
+        self.approximate = approximate
+        self.interval = interval
+        self.out = out
+        self.started = time.monotonic() if started is None else started
+        self.done = 0
+        self.first_byte = None
+        self.curve = []
+        self._next = self.started
+
+    def update(self, nbytes):
+        self.done += nbytes
+        now = time.monotonic()
+        if self.first_byte is None:
+            self.first_byte = now - self.started
+        if now >= self._next:
+            self._next = now + self.interval
+            self._sample(now)
+            self.out.write(f"\r{self.line(now)}")
+            self.out.flush()
+
+    def finish(self):
+        now = time.monotonic()
+        self._sample(now)
+        self.out.write(f"\r{self.line(now)}\n")
+        self.out.flush()
+
+    def line(self, now):
+        seconds = now - self.started
+        rate = self.done / seconds / 1e6 if seconds > 0 else 0.0
+        total = f"/{'~' if self.approximate else ''}{self.total / 1e6:.1f}" if self.total else ""
+        return f"{self.label} {self.done / 1e6:.1f}{total} MB ({rate:.1f} MB/s)"
+
+    def _sample(self, now):
+        self.curve.append([round(now - self.started, 3), self.done])
+        if len(self.curve) > MAX_CURVE_POINTS:
+            # Keep the curve bounded: halve the resolution
+            self.curve = self.curve[::2] + ([self.curve[-1]] if len(self.curve) % 2 == 0 else [])
+            self.interval *= 2
+
+
+class TransferLog:
+    """Rotating JSONL log of finished transfers for one app"""
+
+    def __init__(self, app, path=LOG_PATH, max_bytes=MAX_BYTES, backups=BACKUPS):
+        self.app = app
+        self.path = path
+        self.logger = logging.getLogger(f"airshare.transfers.{app}")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.INFO)
+        if not self.logger.handlers:
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                handler = logging.handlers.RotatingFileHandler(path, maxBytes=max_bytes,
+                                                               backupCount=backups, delay=True)
+                handler.setFormatter(logging.Formatter("%(message)s"))
+                self.logger.addHandler(handler)
+            except OSError as e:
+                print(f"Could not open transfer log: {e}")
+
+    def write(self, record):
+        record = {"time": round(time.time(), 3), "app": self.app, **record}
+        self.logger.info(json.dumps(record, separators=(",", ":")))
+
+
+def file_type(name):
+    ext = os.path.splitext(name or "")[1].lower()
+    return ext or "(none)"
+
+
+def read_records(path=LOG_PATH, since_hours=None):
+    """Records from the log and its backups, oldest first"""
+    cutoff = time.time() - since_hours * 3600 if since_hours else 0
+    backups = [p for p in glob.glob(path + ".*") if p.rsplit(".", 1)[1].isdigit()]
+    records = []
+    for log in sorted(backups, key=lambda p: -int(p.rsplit(".", 1)[1])) + [path]:
+        try:
+            with open(log) as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        continue
+                    if record.get("time", 0) >= cutoff:
+                        records.append(record)
+        except OSError:
+            continue
+    return records
+
+
+def percentile(values, p):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(p / 100 * len(values)))] if values else 0.0
+
+
+def summarize(records, key):
+    """Rows of (group, count, failed, MB, median/p90 MB/s, median/p95 first byte ms)"""
+    groups = defaultdict(list)
+    for record in records:
+        groups[key(record)].append(record)
+    rows = []
+    for group, items in sorted(groups.items(), key=lambda item: -len(item[1])):
+        ok = [r for r in items if r.get("ok")]
+        rates = [r["bytes"] / r["seconds"] / 1e6 for r in ok if r.get("seconds")]
+        latency = [1000 * r["first_byte"] for r in ok if r.get("first_byte") is not None]
+        rows.append((group, len(items), len(items) - len(ok), sum(r["bytes"] for r in ok) / 1e6,
+                     statistics.median(rates) if rates else 0.0, percentile(rates, 90),
+                     statistics.median(latency) if latency else 0.0, percentile(latency, 95)))
+    return rows
+
+
+KEYS = {
+    "peer": lambda r: r.get("peer", "?"),
+    "type": lambda r: r.get("type") or file_type(r.get("name")),
+    "direction": lambda r: f"{r.get('app', '?')} {r.get('direction', '?')}",
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput/latency summary of logged transfers")
+    parser.add_argument("--log", default=LOG_PATH)
+    parser.add_argument("--by", choices=sorted(KEYS), nargs="+", default=["peer", "type"])
+    parser.add_argument("--since", type=float, help="only the last N hours")
+    args = parser.parse_args()
+
+    records = read_records(args.log, args.since)
+    if not records:
+        print(f"No transfers logged in {args.log}")
+        return
+    print(f"{len(records)} transfers")
+    for by in args.by:
+        print(f"\n{by:<22}{'n':>5}{'fail':>6}{'MB':>10}{'MB/s p50':>10}{'p90':>8}{'1st ms p50':>12}{'p95':>8}")
+        for group, n, failed, mb, rate50, rate90, lat50, lat95 in summarize(records, KEYS[by]):
+            print(f"{str(group)[:21]:<22}{n:>5}{failed:>6}{mb:>10.1f}{rate50:>10.1f}{rate90:>8.1f}"
+                  f"{lat50:>12.1f}{lat95:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
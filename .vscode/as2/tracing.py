@@ -0,0 +1,101 @@
+"""End-to-end gesture-to-delivery traces in Chrome trace format.
+
+Enabled with AIRSHARE_TRACE=1. The sender records when the gesture frame was
+captured and confirmed, file resolution, connection open and the first byte
+sent; the receiver records the data arriving and the write + fsync, then
+sends its events back. Receiver clocks are aligned with a simple NTP-style
+offset exchange over the same connection, and the merged trace is written
+to traces/trace_<id>.json (open it in chrome://tracing or Perfetto).
+
+Wire protocol when tracing (before the usual filename + data messages):
+
+    sender -> "TRACE <id>"
+    sender -> "PING"   receiver -> "<receiver clock, us>"   (a few rounds)
+    ...
+    receiver -> JSON list of its events, after the file is fsynced
+"""
+
+import json
+import os
+import time
+import uuid
+
+ENABLED = os.environ.get("AIRSHARE_TRACE") == "1"
+TRACE_DIR = "traces"
+CLOCK_ROUNDS = 3
+
+# Wall clock at start plus a monotonic delta: precise locally, comparable
+# across machines once the offset is known
+_WALL0 = time.time()
+_PERF0 = time.perf_counter()
+
+
+def now_us():
+    return (_WALL0 + time.perf_counter() - _PERF0) * 1e6
+
+
+class Trace:
+    """Events of one send; timestamps in microseconds on the sender clock"""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex[:8]
+        self.events = []
+
+    def span(self, name, start_us, end_us, side="sender", **args):
+        self.events.append({"name": name, "ph": "X", "ts": start_us, "dur": max(end_us - start_us, 0),
+                            "side": side, "args": args})
+
+    def instant(self, name, ts_us=None, side="sender", **args):
+        self.events.append({"name": name, "ph": "i", "s": "g", "ts": ts_us or now_us(),
+                            "side": side, "args": args})
+
+    def add_remote(self, events, offset_us):
+        """Add receiver events, shifting them onto the sender clock"""
+        for event in events:
+            event = dict(event, ts=event["ts"] - offset_us, side="receiver")
+            self.events.append(event)
+
+    def save(self, directory=TRACE_DIR):
+        os.makedirs(directory, exist_ok=True)
+        pids = {"sender": 1, "receiver": 2}
+        trace_events = [{"name": "process_name", "ph": "M", "pid": pid, "args": {"name": side}}
+                        for side, pid in pids.items()]
+        origin = min((e["ts"] for e in self.events), default=0)
+        for event in self.events:
+            event = dict(event)
+            event["pid"] = pids[event.pop("side")]
+            event["tid"] = 1
+            event["ts"] -= origin
+            trace_events.append(event)
+        path = os.path.join(directory, f"trace_{self.id}.json")
+        with open(path, "w") as f:
+            json.dump({"traceEvents": trace_events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+async def sync_clock(websocket, trace):
+    """Sender side: announce the trace and estimate receiver - sender offset"""
+    await websocket.send(f"TRACE {trace.id}")
+    best = None
+    for _ in range(CLOCK_ROUNDS):
+        t0 = now_us()
+        await websocket.send("PING")
+        t1 = float(await websocket.recv())
+        t2 = now_us()
+        rtt = t2 - t0
+        if best is None or rtt < best[0]:
+            best = (rtt, t1 - (t0 + t2) / 2)
+    trace.instant("clock sync", rtt_us=best[0], offset_us=best[1])
+    return best[1]
+
+
+async def answer_clock(websocket, message):
+    """Receiver side: answer PINGs; returns (trace id or None, next message)"""
+    if not isinstance(message, str) or not message.startswith("TRACE "):
+        return None, message
+    trace_id = message.split(" ", 1)[1]
+    message = await websocket.recv()
+    while message == "PING":
+        await websocket.send(str(now_us()))
+        message = await websocket.recv()
+    return trace_id, message
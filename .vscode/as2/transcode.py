@@ -0,0 +1,139 @@
+"""Bandwidth-aware transcoding for video sends.
+
+LinkEstimator keeps an EWMA of the throughput measured on earlier sends to
+each partner (~/.airshare/throughput.json). When the link cannot carry the
+original clip in about real time, choose_target() picks a bitrate and height
+from a small ladder and Transcoder runs ffmpeg to produce fragmented MP4 on
+stdout. Its output is sent as length-prefixed chunks while ffmpeg is still
+encoding, so encoding and transfer overlap; the final size is not known up
+front, so the header size is -1 (followed by duration, streamable flag and
+an estimated size for the receiver's playback buffering).
+"""
+
+import json
+import os
+import shutil
+import struct
+import subprocess
+import threading
+
+import cv2
+
+FFMPEG = shutil.which("ffmpeg")
+HISTORY_PATH = os.path.expanduser("~/.airshare/throughput.json")
+EWMA_WEIGHT = 0.3
+HEADROOM = 0.8  # use this fraction of the measured throughput
+AUDIO_KBPS = 96
+
+# (height, video kbit/s), best first
+LADDER = [(1080, 5000), (720, 2500), (480, 1200), (360, 700), (240, 400)]
+
+
+class LinkEstimator:
+    """EWMA of measured send throughput (bytes/s) per partner"""
+
+    def __init__(self, path=HISTORY_PATH):
+        self.path = path
+        self._lock = threading.Lock()  # parallel sends to several partners
+        try:
+            with open(path) as f:
+                self.history = json.load(f)
+        except (OSError, ValueError):
+            self.history = {}
+
+    def get(self, partner):
+        return self.history.get(partner)
+
+    def record(self, partner, nbytes, seconds):
+        if seconds <= 0 or nbytes < 256 * 1024:
+            return  # too small to say anything about the link
+        rate = nbytes / seconds
+        with self._lock:
+            old = self.history.get(partner)
+            self.history[partner] = rate if old is None else (1 - EWMA_WEIGHT) * old + EWMA_WEIGHT * rate
+            try:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                with open(self.path, "w") as f:
+                    json.dump(self.history, f, indent=2)
+            except OSError as e:
+                print(f"Could not save throughput history: {e}")
+
+
+def probe(path):
+    """(height, duration seconds, total bitrate kbit/s) of a clip"""
+    cap = cv2.VideoCapture(path)
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frames = cap.get(cv2.CAP_PROP_FRAME_COUNT)
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    duration = frames / fps if fps > 0 and frames > 0 else 0.0
+    kbps = os.path.getsize(path) * 8 / 1000 / duration if duration else 0.0
+    return height, duration, kbps
+
+
+def choose_target(throughput, height, kbps):
+    """(height, video kbit/s) to transcode to, or None to send the original"""
+    if throughput is None or not kbps:
+        return None
+    budget = throughput * 8 / 1000 * HEADROOM - AUDIO_KBPS
+    if kbps <= budget:
+        return None
+    for rung_height, rung_kbps in LADDER:
+        if rung_height <= height and rung_kbps <= budget:
+            return rung_height, rung_kbps
+    return LADDER[-1]
+
+
+class Transcoder:
+    """ffmpeg re-encode to fragmented MP4, read incrementally from stdout"""
+
+    def __init__(self, path, height, kbps):
+        self.proc = subprocess.Popen(
+            [FFMPEG, "-nostdin", "-v", "error", "-i", path,
+             "-vf", f"scale=-2:'min({height},ih)'", "-c:v", "libx264", "-preset", "veryfast",
+             "-b:v", f"{kbps}k", "-maxrate", f"{kbps}k", "-bufsize", f"{2 * kbps}k",
+             "-c:a", "aac", "-b:a", f"{AUDIO_KBPS}k",
+             "-movflags", "frag_keyframe+empty_moov+default_base_moof", "-f", "mp4", "pipe:1"],
+            stdin=subprocess.DEVNULL,  # else ffmpeg reads the app's stdin (headless commands)
+            stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def chunks(self, size):
+        """Encoded bytes as soon as ffmpeg writes them (at most size per chunk)"""
+        while True:
+            chunk = self.proc.stdout.read1(size)
+            if not chunk:
+                break
+            yield chunk
+        if self.proc.wait() != 0:
+            raise RuntimeError(f"ffmpeg failed: {self.proc.stderr.read().decode(errors='replace').strip()}")
+
+    def close(self):
+        if self.proc.poll() is None:
+            self.proc.kill()
+        self.proc.wait()
+
+
+def send_chunk(sock, data):
+    sock.sendall(struct.pack(">I", len(data)))
+    sock.sendall(data)
+
+
+def recv_exact(conn, n):
+    buf = bytearray()
+    while len(buf) < n:
+        data = conn.recv(n - len(buf))
+        if not data:
+            raise ConnectionError("Connection closed mid-transfer")
+        buf += data
+    return bytes(buf)
+
+
+def recv_chunks(conn):
+    """Length-prefixed chunks until the zero-length terminator"""
+    while True:
+        (length,) = struct.unpack(">I", recv_exact(conn, 4))
+        if length == 0:
+            return
+        yield recv_exact(conn, length)
@@ -1,4 +1,6 @@
+import argparse
 import cv2
+import itertools
 import mediapipe as mp
 import socket
 import threading
@@ -6,6 +8,22 @@ import os
 import time
 import numpy as np
 
+import gestures
+import metrics as stage_metrics
+from camera import CAPTURE_PROFILES, DEFAULT_PROFILE, open_camera
+from controls import Controls, read_key
+from framebuf import FramePool
+from hud import Hud
+from pairing import QrScanner, load_identity, make_qr, offer, pair, payload, save_qr
+from player import Player
+from progressive import GrowingFile, ProgressiveCapture, make_streamable, probe_duration
+from secure import SecureChannel, open_connection
+from session import SessionRegistry
+from telemetry import TransferLog
+from video_index import VideoIndexer
+from transcode import (AUDIO_KBPS, FFMPEG, LinkEstimator, Transcoder, choose_target, probe,
+                       recv_chunks, send_chunk)
+
 # MediaPipe Hands 
 mp_hands = mp.solutions.hands
 mp_drawing = mp.solutions.drawing_utils
@@ -21,11 +39,13 @@ CHUNK_SIZE = 1024 * 1024
 received_videos_folder = "received_videos"
 os.makedirs(received_videos_folder, exist_ok=True)
 
-# Global variables
-receiving_mode = False
-receive_thread = None
-partner_ip = None
-selected_video_path = None
+# Partners, receive mode, the selected video and per-peer stats (see session.py)
+sessions = SessionRegistry(log=TransferLog("video1"))
+headless_mode = False
+channel = None  # SecureChannel with --secure
+link = LinkEstimator()  # measured throughput per partner, for --transcode
+receive_ids = itertools.count(1)  # keeps videos received in the same second apart
+playback_lock = threading.Lock()
 
 def get_ip_address():
     """Get local IP address automatically"""
@@ -38,9 +58,10 @@ def get_ip_address():
     except Exception:
         return "127.0.0.1"
 
-def send_video():
-    """Send the selected video file to partner"""
-    global selected_video_path
+def send_video(transcode=False):
+    """Send the selected video file to every partner (in parallel threads if several)"""
+    state = sessions.state
+    selected_video_path = state.selected
     
     if not selected_video_path:
         print("❌ No video selected! Press 's' to choose a file")
@@ -50,21 +71,50 @@ def send_video():
         print(f"❌ File not found: {selected_video_path}")
         return
         
-    if not partner_ip:
+    if not state.targets:
         print("❌ Partner IP not configured!")
         return
 
+    threads = [threading.Thread(target=send_video_to, args=(peer, selected_video_path, transcode))
+               for peer in state.targets]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+def send_video_to(partner_ip, selected_video_path, transcode=False):
+    """Send a video file to one partner.
+
+    With transcode=True a clip too big for the measured link is re-encoded on
+    the fly and streamed while ffmpeg is still encoding (see transcode.py).
+    """
     print(f"\n🚀 Sending: {os.path.basename(selected_video_path)}")
     print(f"📡 Receiver IP: {partner_ip}")
 
+    target = None
+    if transcode:
+        height, duration, kbps = probe(selected_video_path)
+        target = choose_target(link.get(partner_ip), height, kbps)
+        if target and FFMPEG is None:
+            print("ℹ️ ffmpeg not found: sending the original file")
+            target = None
+
+    # Fragmented MP4 (or a container with its header up front) can be played while it arrives
+    send_path, streamable, temporary = (selected_video_path, True, None) if target else \
+        make_streamable(selected_video_path)
     try:
-        with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-            s.settimeout(10)
-            s.connect((partner_ip, PORT))
+        # Connection failures are logged as failed transfers too
+        with sessions.transfer(partner_ip, "send", selected_video_path, CHUNK_SIZE) as transfer, \
+                open_connection(partner_ip, PORT, 10, channel) as s:
             
-            # Send file size
-            file_size = os.path.getsize(selected_video_path)
-            s.sendall(str(file_size).encode())
+            # Send file size, duration and whether it can be played progressively
+            if target:
+                # Size unknown until ffmpeg finishes: -1, plus an estimate for buffering
+                estimate = int(duration * (target[1] + AUDIO_KBPS) * 1000 / 8)
+                s.sendall(f"-1 {duration:.3f} 1 {estimate}".encode())
+            else:
+                file_size = os.path.getsize(send_path)
+                s.sendall(f"{file_size} {probe_duration(send_path):.3f} {int(streamable)}".encode())
             
             # Wait for ACK
             ack = s.recv(1024)
@@ -73,20 +123,47 @@ def send_video():
             
             # Send file in chunks
             bytes_sent = 0
-            with open(selected_video_path, 'rb') as f:
-                while bytes_sent < file_size:
-                    chunk = f.read(CHUNK_SIZE)
-                    if not chunk:
-                        break
-                    s.sendall(chunk)
-                    bytes_sent += len(chunk)
-                    print(f"📤 Sent {bytes_sent}/{file_size} bytes", end="\r")
+            started = time.perf_counter()
+            network_seconds = 0.0
+            if target:
+                print(f"🎚️ Link ~{link.get(partner_ip) * 8 / 1e6:.1f} Mbit/s: transcoding to "
+                      f"{target[0]}p at {target[1]} kbit/s")
+                transcoder = Transcoder(selected_video_path, *target)
+                progress = transfer.track("📤 Sent", estimate, approximate=True)
+                try:
+                    for chunk in transcoder.chunks(CHUNK_SIZE):
+                        sent_at = time.perf_counter()
+                        send_chunk(s, chunk)
+                        network_seconds += time.perf_counter() - sent_at
+                        bytes_sent += len(chunk)
+                        progress.update(len(chunk))
+                finally:
+                    transcoder.close()
+                send_chunk(s, b"")
+            else:
+                progress = transfer.track("📤 Sent", file_size)
+                with open(send_path, 'rb') as f:
+                    while bytes_sent < file_size:
+                        chunk = f.read(CHUNK_SIZE)
+                        if not chunk:
+                            break
+                        s.sendall(chunk)
+                        bytes_sent += len(chunk)
+                        progress.update(len(chunk))
+            progress.finish()
             
             # Verify completion
             if s.recv(1024) == b"DONE":
-                print("\n✅ Video sent successfully!")
+                print("✅ Video sent successfully!")
+                transfer.done(bytes_sent)
+                elapsed = time.perf_counter() - started
+                if not target:
+                    link.record(partner_ip, bytes_sent, elapsed)
+                elif network_seconds > elapsed / 2:
+                    # Only a measure of the link if sending, not encoding, was the bottleneck
+                    link.record(partner_ip, bytes_sent, network_seconds)
             else:
-                print("\n⚠️ Transfer incomplete")
+                print("⚠️ Transfer incomplete")
 
     except socket.timeout:
         print("\n⌛ Connection timed out")
@@ -94,173 +171,314 @@ def send_video():
         print("\n❌ Connection refused. Is receiver running?")
     except Exception as e:
         print(f"\n❌ Error: {str(e)}")
+    finally:
+        if temporary:
+            os.remove(temporary)
 
 def start_receive_server():
-    """Start listening for incoming files"""
-    global receiving_mode
-    
+    """Start listening for incoming files.
+
+    Every accepted connection is received on its own thread, so several peers
+    can send at once; receive mode ends when no new connection arrives for 60s.
+    """
     def receive_server():
         try:
             with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
                 s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
                 s.bind(('0.0.0.0', PORT))
                 s.settimeout(60)
-                s.listen(1)
+                s.listen(8)
                 
                 print(f"\n📡 Ready to receive! Your IP: {get_ip_address()}")
-                print("Waiting for connection...")
+                print("Waiting for connections...")
                 
-                conn, addr = s.accept()
-                with conn:
-                    # Get file size
-                    file_size = int(conn.recv(1024).decode())
-                    conn.sendall(b"ACK")
-                    
-                    # Receive file
-                    received_bytes = 0
-                    file_data = b""
-                    while received_bytes < file_size:
-                        chunk = conn.recv(CHUNK_SIZE)
-                        if not chunk:
-                            break
-                        file_data += chunk
-                        received_bytes += len(chunk)
-                        print(f"📥 Received {received_bytes}/{file_size} bytes", end="\r")
-                    
-                    # Save file
-                    timestamp = time.strftime("%Y%m%d_%H%M%S")
-                    filename = f"received_{timestamp}.mp4"
-                    save_path = os.path.join(received_videos_folder, filename)
-                    
-                    with open(save_path, 'wb') as f:
-                        f.write(file_data)
-                    
-                    print(f"\n💾 Saved to: {save_path}")
-                    conn.sendall(b"DONE")
-                    
-                    play_received_video(save_path)
+                while True:
+                    conn, addr = s.accept()
+                    threading.Thread(target=receive_connection, args=(conn, addr), daemon=True).start()
                     
         except socket.timeout:
-            print("\n⌛ Receive mode timed out (60s)")
+            print("\n⌛ Receive mode timed out (60s without a new connection)")
         except Exception as e:
             print(f"\n❌ Receive error: {str(e)}")
         finally:
-            receiving_mode = False
+            sessions.update(receiving=False)
     
-    receiving_mode = True
+    sessions.update(receiving=True)
     threading.Thread(target=receive_server, daemon=True).start()
 
-def play_received_video(video_path):
-    """Play the received video"""
-    cap = cv2.VideoCapture(video_path)
+def receive_connection(conn, addr):
+    """Handshake (with --secure) and receive on a connection's own thread"""
+    try:
+        if channel is not None:
+            conn = channel.accept(conn)
+        receive_video(conn, addr)
+    except Exception as e:
+        print(f"\n❌ Receive error from {addr[0]}: {str(e)}")
+        conn.close()
+
+def receive_video(conn, addr):
+    """Receive one video on an accepted connection, then play it"""
+    with conn, sessions.transfer(addr[0], "receive", chunk_size=CHUNK_SIZE) as transfer:
+        # Get file size (plus duration and streamable flag from newer senders)
+        header = conn.recv(1024).decode().split()
+        file_size = int(header[0])
+        duration = float(header[1]) if len(header) > 1 else 0.0
+        streamable = len(header) > 2 and header[2] == "1"
+        chunked = file_size < 0  # transcoded on the fly: length-prefixed chunks
+        if chunked:
+            file_size = int(header[3]) if len(header) > 3 else 0
+        conn.sendall(b"ACK")
+
+        # Write chunks straight to the file as they arrive
+        timestamp = time.strftime("%Y%m%d_%H%M%S")
+        filename = f"received_{timestamp}_{next(receive_ids)}.mp4"
+        save_path = os.path.join(received_videos_folder, filename)
+        transfer.name = save_path
+        incoming = GrowingFile(save_path, file_size)
+
+        # Streamable clips start playing once about a second is buffered
+        player = None
+        if streamable and duration > 0 and not headless_mode:
+            player = threading.Thread(target=play_received_video,
+                                      args=(save_path, incoming, duration), daemon=True)
+            player.start()
+
+        # Receive file
+        received_bytes = 0
+        progress = transfer.track("📥 Received", file_size, approximate=chunked)
+        try:
+            if chunked:
+                for chunk in recv_chunks(conn):
+                    incoming.write(chunk)
+                    received_bytes += len(chunk)
+                    progress.update(len(chunk))
+            else:
+                while received_bytes < file_size:
+                    chunk = conn.recv(CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    incoming.write(chunk)
+                    received_bytes += len(chunk)
+                    progress.update(len(chunk))
+        finally:
+            incoming.close()
+            progress.finish()
+
+        print(f"💾 Saved to: {save_path}")
+        conn.sendall(b"DONE")
+        if chunked or received_bytes >= file_size:
+            transfer.done(received_bytes)
+
+    # Playback is not part of the transfer's timing
+    if player is not None:
+        player.join()
+    elif not headless_mode:
+        play_received_video(save_path)
+
+def play_received_video(video_path, incoming=None, duration=0.0):
+    """Play the received video (while it is still arriving if incoming is a GrowingFile)"""
+    with playback_lock:  # videos received at the same time play one after another
+        _play_received_video(video_path, incoming, duration)
+
+def _play_received_video(video_path, incoming, duration):
+    start = time.perf_counter()
+    cap = ProgressiveCapture(incoming, duration) if incoming else cv2.VideoCapture(video_path)
     if not cap.isOpened():
         print(f"❌ Could not open video: {video_path}")
         return
     
-    print("\n▶️ Playing received video (Press 'q' to stop)")
-    while cap.isOpened():
-        ret, frame = cap.read()
-        if not ret:
-            break
-            
-        cv2.imshow('Received Video', frame)
-        if cv2.waitKey(25) & 0xFF == ord('q'):
-            break
-            
+    if incoming:
+        print(f"\n▶️ Playing while receiving, started after {time.perf_counter() - start:.1f}s of buffering "
+              f"(Press 'q' to stop)")
+    else:
+        print("\n▶️ Playing received video (Press 'q' to stop)")
+    # Decoded ahead on a thread, shown at the clip's own frame rate
+    print(Player(cap).play())
     cap.release()
     cv2.destroyAllWindows()
 
-def detect_gestures():
-    """Main gesture detection loop"""
-    global partner_ip, selected_video_path, receiving_mode
+def draw_strip(frame, strip, margin=10):
+    """Thumbnail strip of the selected video along the bottom of the frame"""
+    if strip is None:
+        return
+    h = min(strip.shape[0], frame.shape[0] - 2 * margin)
+    w = min(strip.shape[1], frame.shape[1] - 2 * margin)
+    y = frame.shape[0] - h - margin
+    frame[y:y + h, margin:margin + w] = strip[:h, :w]
+
+def show_pairing_code(headless=False):
+    """Show this device's pairing QR code (saved as a PNG when headless)"""
+    ip = get_ip_address()
+    identity = channel.identity if channel is not None else load_identity()
+    text = payload(ip, PORT, identity)
+    if headless:
+        print(f"🔳 Pairing code for {ip} saved to {save_qr(text)}")
+    else:
+        cv2.imshow("Pairing code", make_qr(text))
+
+def detect_gestures(headless=False, control_port=None, metrics=stage_metrics.NULL_METRICS,
+                    camera_profile=DEFAULT_PROFILE, transcode=False, secure=False, partner=None):
+    """Main gesture detection loop (headless: no drawing, keys from stdin/socket).
+
+    partner skips the partner IP prompt; headless runs never prompt.
+    """
+    global headless_mode, channel
+    headless_mode = headless
+    if secure:
+        channel = SecureChannel()
+        print(f"🔐 Secure transport on, fingerprint {channel.identity.fingerprint[:16]}...")
     
     # Initialize camera
-    cap = cv2.VideoCapture(0)
-    if not cap.isOpened():
+    cap = open_camera(profile=camera_profile)
+    if cap is None or not cap.isOpened():
         print("❌ Could not open camera")
         return
     
     # Set partner IP
     print(f"\n🖥️  Your IP address: {get_ip_address()}")
-    partner_ip = input("Enter partner's IP address: ").strip()
+    if partner is None and not headless:
+        partner = input("Enter partner's IP address (several: comma separated, "
+                        "empty to scan their pairing code): ")
+    if sessions.set_targets(partner or ""):
+        print(f"Partner IP set to: {', '.join(sessions.state.targets)}")
+    elif headless:
+        print("No partner yet: type 'p <ip>' or hold their pairing code up to the camera")
+    else:
+        print("No partner yet: hold their pairing code ('k' on their side) up to the camera")
     
     print("\n👋 Gesture Controls:")
     print("👍 Thumbs Up - Send selected video")
     print("🖐️ Open Hand - Enter receive mode")
     print("Press 's' - Select video file")
     print("Press 'p' - Change partner IP")
+    print("Press 'k' - Show your pairing code")
+    print("Press 'y' - Pair with a scanned pairing code")
     print("Press 'q' - Quit program")
 
+    controls = Controls(port=control_port) if headless else None
+    if headless:
+        print("🕶️  Headless mode: type 's <path>', 'p <ip>', 'k', 'y' or 'q' (stdin or control socket)")
+
+    hud = Hud()
+    indexer = VideoIndexer()
+    indexed_path = None
+    video_index = None
+    scanner = QrScanner()  # partners' pairing codes, sampled from the camera frames
+    pending_pairing = None  # scanned, waiting for 'y'
+    pool = FramePool(metrics=metrics)
+    frames = 0
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
     while True:
-        ret, frame = cap.read()
+        metrics.end_frame()
+        # Read, flip and convert into reused buffers
+        ret, frame, rgb_frame = pool.read(cap)
         if not ret:
             print("⚠️ Camera error")
             break
+        frames += 1
+        pairing = scanner.feed(frame)
+        if pairing is not None:
+            pending_pairing = offer(pairing, channel.peers if channel is not None else None,
+                                    sessions.state.targets) or pending_pairing
             
-        frame = cv2.flip(frame, 1)
-        rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
         results = hands.process(rgb_frame)
+        metrics.mark("process")
         
-        cv2.putText(frame, f"Partner: {partner_ip}", (10, 30), 
-                   cv2.FONT_HERSHEY_SIMPLEX, 0.6, (255, 255, 255), 1)
-        
-        if selected_video_path:
-            cv2.putText(frame, f"Selected: {os.path.basename(selected_video_path)}", (10, 60), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.5, (0, 255, 255), 1)
-        
-        if receiving_mode:
-            cv2.putText(frame, "RECEIVE MODE ACTIVE", (10, 90), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 0, 255), 1)
+        # One consistent snapshot per frame, read without locking
+        state = sessions.state
+        selected_video_path = state.selected
+        receiving_mode = state.receiving
+        if not headless:
+            # HUD strips are only re-rendered when their text changes
+            hud.set("partner", f"Partner: {', '.join(state.targets)}", (10, 30), 0.6)
+            
+            if selected_video_path:
+                # Index (duration, keyframes, thumbnails) in the background; cached per file version
+                if indexed_path != selected_video_path:
+                    indexed_path = selected_video_path
+                    video_index = indexer.index(selected_video_path)
+                selected_text = f"Selected: {os.path.basename(selected_video_path)}"
+                if video_index.done() and video_index.exception() is None:
+                    selected_text += f" ({video_index.result().describe()})"
+                hud.set("selected", selected_text, (10, 60), 0.5, (0, 255, 255))
+            else:
+                hud.clear("selected")
+            
+            if receiving_mode:
+                hud.set("receiving", "RECEIVE MODE ACTIVE", (10, 90), 0.6, (0, 0, 255))
+            else:
+                hud.clear("receiving")
+            if pending_pairing is not None:
+                hud.set("pairing", f"Press 'y' to pair with {pending_pairing.ip}", (10, 120), 0.6, (0, 255, 255))
+            else:
+                hud.clear("pairing")
+            hud.clear("send")
+            hud.clear("receive")
+            metrics.mark("draw")
 
         # Gesture detection
         if results.multi_hand_landmarks:
             for hand_landmarks in results.multi_hand_landmarks:
-                mp_drawing.draw_landmarks(
-                    frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
-                
-                landmarks = hand_landmarks.landmark
-                wrist = landmarks[mp_hands.HandLandmark.WRIST]
+                if not headless:
+                    mp_drawing.draw_landmarks(
+                        frame, hand_landmarks, mp_hands.HAND_CONNECTIONS)
+                    metrics.mark("draw")
                 
-                # Thumb tip position (for thumbs up)
-                thumb_tip = landmarks[mp_hands.HandLandmark.THUMB_TIP]
-                
-                # Finger tips (for open hand)
-                finger_tips = [
-                    landmarks[mp_hands.HandLandmark.INDEX_FINGER_TIP],
-                    landmarks[mp_hands.HandLandmark.MIDDLE_FINGER_TIP],
-                    landmarks[mp_hands.HandLandmark.RING_FINGER_TIP],
-                    landmarks[mp_hands.HandLandmark.PINKY_TIP]
-                ]
+                found = gestures.video_gestures(hand_landmarks.landmark)
+                metrics.mark("gestures")
                 
                 # Thumbs Up detection (send)
-                if thumb_tip.y < wrist.y:  
-                    cv2.putText(frame, "SEND", (50, 100), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+                if "send" in found:
+                    hud.set("send", "SEND", (50, 100), 1, (0, 255, 0), 2)
                     if selected_video_path and not receiving_mode:
                         print("\n👍 Thumbs up detected - Sending video!")
-                        send_video()
+                        send_video(transcode)
                         time.sleep(2)  
                 
                 # Open Hand  (receive)
-                fingers_extended = sum(1 for tip in finger_tips if tip.y < wrist.y)
-                if fingers_extended >= 3:  
-                    cv2.putText(frame, "RECEIVE", (50, 100), 
-                               cv2.FONT_HERSHEY_SIMPLEX, 1, (255, 0, 0), 2)
+                if "receive" in found:
+                    hud.set("receive", "RECEIVE", (50, 100), 1, (255, 0, 0), 2)
                     if not receiving_mode:
                         print("\n🖐️ Open hand detected - Starting receive mode!")
                         start_receive_server()
                         time.sleep(2)  
+                metrics.mark("actions")
 
-        cv2.imshow("Gesture Video Sender", frame)
+        if not headless:
+            if selected_video_path and video_index.done() and video_index.exception() is None:
+                draw_strip(frame, video_index.result().strip)
+            hud.draw(frame)
+            metrics.draw_panel(frame)
+            metrics.mark("draw")
+            cv2.imshow("Gesture Video Sender", frame)
         
         # Keyboard controls
-        key = cv2.waitKey(1) & 0xFF
-        if key == ord('q'):
+        key, arg = read_key(controls)
+        metrics.mark("display")
+        if key == 'q':
             break
-        elif key == ord('p'):
-            partner_ip = input("Enter new partner IP: ").strip()
-            print(f"Partner IP updated to: {partner_ip}")
-        elif key == ord('s'):  
+        elif key == 'p':
+            if arg:
+                targets = sessions.set_targets(arg)
+            elif headless:
+                print("Usage: p <partner ip>[,<partner ip>...]")
+                continue
+            else:
+                targets = sessions.set_targets(input("Enter new partner IP: "))
+            print(f"Partner IP updated to: {', '.join(targets)}")
+        elif key == 'k':
+            show_pairing_code(headless)
+        elif key == 'y' and pending_pairing is not None:
+            pair(pending_pairing, sessions, channel.peers if channel is not None else None, PORT)
+            pending_pairing = None
+        elif key == 's' and arg:
+            sessions.update(selected=arg)
+            print(f"✅ Selected: {os.path.basename(arg)}")
+        elif key == 's' and headless:
+            print("Usage: s <path to video>")
+        elif key == 's':  
             try:
                 from AppKit import NSOpenPanel, NSOKButton
                 panel = NSOpenPanel.openPanel()
@@ -270,14 +488,22 @@ def detect_gestures():
                 panel.setAllowedFileTypes_(["mp4", "mov", "avi"])
                 
                 if panel.runModal() == NSOKButton:
-                    selected_video_path = panel.URLs()[0].path()
-                    print(f"✅ Selected: {os.path.basename(selected_video_path)}")
+                    sessions.update(selected=panel.URLs()[0].path())
+                    print(f"✅ Selected: {os.path.basename(sessions.state.selected)}")
             except ImportError:
                 print("❌ Could not import AppKit. Using fallback method.")
-                selected_video_path = input("Enter full path to video file: ").strip()
+                sessions.update(selected=input("Enter full path to video file: ").strip())
 
+    wall = time.perf_counter() - wall_start
+    cpu = time.process_time() - cpu_start
+    if wall > 0:
+        print(f"\n📊 {frames} frames in {wall:.1f}s ({frames / wall:.1f} FPS), CPU {100 * cpu / wall:.0f}%")
+    sessions.report()
     cap.release()
-    cv2.destroyAllWindows()
+    indexer.shutdown()
+    scanner.shutdown()
+    if not headless:
+        cv2.destroyAllWindows()
     print("\nProgram closed")
 
 if __name__ == "__main__":
@@ -285,4 +511,18 @@ if __name__ == "__main__":
     print("1. Press 's' to select a video file")
     print("2. Use 👍 Thumbs Up to send")
     print("3. Use 🖐️ Open Hand to receive\n")
-    detect_gestures()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Gesture video sender")
+    parser.add_argument("--headless", action="store_true", help="no preview window or drawing")
+    parser.add_argument("--control-port", type=int, help="localhost port for headless commands")
+    parser.add_argument("--partner", help="partner IP, or several comma separated (skips the prompt)")
+    parser.add_argument("--camera-profile", choices=sorted(CAPTURE_PROFILES), default=DEFAULT_PROFILE,
+                        help="capture format/resolution/buffering (see camera.py)")
+    parser.add_argument("--transcode", action="store_true",
+                        help="re-encode to fit the measured link throughput (needs ffmpeg)")
+    parser.add_argument("--secure", action="store_true",
+                        help="encrypt and authenticate transfers with paired peers (see secure.py)")
+    stage_metrics.add_arguments(parser)
+    args = parser.parse_args()
+    detect_gestures(headless=args.headless, control_port=args.control_port,
+                    metrics=stage_metrics.from_args(args), camera_profile=args.camera_profile,
+                    transcode=args.transcode, secure=args.secure, partner=args.partner)
\ No newline at end of file
@@ -0,0 +1,252 @@
+"""Background indexing of selected videos: metadata, keyframes, thumbnails.
+
+For a clip picked in video1.py the indexer records duration, FPS and
+resolution, a keyframe table (time and byte offset of every sync sample)
+and a strip of thumbnails. Results are cached in ~/.airshare/video_index,
+keyed by path + mtime + size, so picking the same file again is instant.
+
+Keyframes come from ffprobe when it is installed, otherwise from the MP4/MOV
+sample tables (stss/stco/stsz/stsc/stts) parsed directly. The table is what
+seeking (keyframe_before) and range-based transfers (ranges) build on.
+"""
+
+import bisect
+import hashlib
+import json
+import os
+import shutil
+import struct
+import subprocess
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+CACHE_DIR = os.path.expanduser("~/.airshare/video_index")
+FFPROBE = shutil.which("ffprobe")
+THUMBNAILS = 8
+THUMB_HEIGHT = 48
+
+
+class VideoIndex:
+    """Index of one clip; keyframes is a list of (seconds, byte offset)"""
+
+    def __init__(self, path, duration, fps, width, height, keyframes, strip=None):
+        self.path = path
+        self.duration = duration
+        self.fps = fps
+        self.width = width
+        self.height = height
+        self.keyframes = keyframes
+        self.strip = strip  # BGR thumbnail strip (not part of the JSON)
+
+    def describe(self):
+        return (f"{self.duration:.1f}s {self.width}x{self.height} @ {self.fps:.0f} FPS, "
+                f"{len(self.keyframes)} keyframes")
+
+    def keyframe_before(self, seconds):
+        """(seconds, byte offset) of the last keyframe at or before seconds"""
+        if not self.keyframes:
+            return 0.0, 0
+        i = bisect.bisect_right([t for t, _ in self.keyframes], seconds)
+        return self.keyframes[max(i - 1, 0)]
+
+    def ranges(self, parts):
+        """Split the file into up to parts byte ranges that start at keyframes"""
+        size = os.path.getsize(self.path)
+        offsets = sorted({offset for _, offset in self.keyframes} | {0})
+        bounds = [0]
+        for k in range(1, parts):
+            i = bisect.bisect_left(offsets, size * k // parts)
+            if i < len(offsets) and offsets[i] > bounds[-1]:
+                bounds.append(offsets[i])
+        bounds.append(size)
+        return [(start, end) for start, end in zip(bounds, bounds[1:]) if end > start]
+
+    def to_json(self):
+        return {"path": self.path, "duration": self.duration, "fps": self.fps, "width": self.width,
+                "height": self.height, "keyframes": self.keyframes}
+
+
+def cache_key(path):
+    st = os.stat(path)
+    return hashlib.sha1(f"{os.path.abspath(path)}|{st.st_mtime_ns}|{st.st_size}".encode()).hexdigest()
+
+
+def _boxes(f, start, end):
+    """(type, payload start, payload end) of the boxes in [start, end)"""
+    pos = start
+    while pos + 8 <= end:
+        f.seek(pos)
+        size, kind = struct.unpack(">I4s", f.read(8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - pos
+        if size < header:
+            return
+        yield kind, pos + header, pos + size
+        pos += size
+
+
+def _table(f, start, fmt, fields=1):
+    """Entries of a full-box sample table (version/flags, count, entries)"""
+    f.seek(start + 4)
+    (count,) = struct.unpack(">I", f.read(4))
+    data = np.frombuffer(f.read(count * fields * struct.calcsize(fmt)),
+                         dtype=">u8" if fmt == "Q" else ">u4")
+    return data.astype(np.int64).reshape(count, fields) if fields > 1 else data.astype(np.int64)
+
+
+def _trak_tables(f, start, end, tables):
+    for kind, body, box_end in _boxes(f, start, end):
+        if kind in (b"mdia", b"minf", b"stbl"):
+            _trak_tables(f, body, box_end, tables)
+        elif kind == b"hdlr":
+            f.seek(body + 8)
+            tables["handler"] = f.read(4)
+        elif kind == b"mdhd":
+            f.seek(body)
+            version = f.read(1)[0]
+            f.seek(body + (20 if version == 1 else 12))
+            tables["timescale"] = struct.unpack(">I", f.read(4))[0]
+        elif kind == b"stsz":
+            f.seek(body + 4)
+            fixed, count = struct.unpack(">II", f.read(8))
+            tables[kind] = (np.full(count, fixed, np.int64) if fixed else
+                            np.frombuffer(f.read(4 * count), ">u4").astype(np.int64))
+        elif kind in (b"stss", b"stco", b"co64", b"stsc", b"stts"):
+            fields = {b"stsc": 3, b"stts": 2}.get(kind, 1)
+            tables[kind] = _table(f, body, "Q" if kind == b"co64" else "I", fields)
+
+
+def video_tables(path):
+    """Sample tables of the first video track of an MP4/MOV, or None"""
+    with open(path, "rb") as f:
+        end = f.seek(0, os.SEEK_END)
+        for kind, body, box_end in _boxes(f, 0, end):
+            if kind != b"moov":
+                continue
+            for trak, trak_body, trak_end in _boxes(f, body, box_end):
+                if trak == b"trak":
+                    tables = {}
+                    _trak_tables(f, trak_body, trak_end, tables)
+                    if tables.get("handler") == b"vide":
+                        return tables
+    return None
+
+
+def mp4_keyframes(path):
+    """Keyframes of the first video track from MP4/MOV sample tables, or None"""
+    tables = video_tables(path)
+    if tables is None:
+        return None
+    chunks = tables.get(b"stco", tables.get(b"co64"))
+    if chunks is None or any(k not in tables for k in (b"stsz", b"stsc", b"stts")):
+        return None
+    sizes = tables[b"stsz"]
+    # Byte offset of every sample: its chunk's offset plus the earlier samples in that chunk
+    per_chunk = np.zeros(len(chunks), np.int64)
+    stsc = tables[b"stsc"]
+    for i, (first, count, _) in enumerate(stsc):
+        last = stsc[i + 1][0] - 1 if i + 1 < len(stsc) else len(chunks)
+        per_chunk[first - 1:last] = count
+    chunk_of = np.repeat(np.arange(len(chunks)), per_chunk)[:len(sizes)]
+    before = np.cumsum(sizes) - sizes
+    first_sample = np.concatenate(([0], np.cumsum(per_chunk)[:-1]))
+    offsets = chunks[chunk_of] + before - before[first_sample[chunk_of]]
+    stts = tables[b"stts"]
+    times = np.concatenate(([0], np.cumsum(np.repeat(stts[:, 1], stts[:, 0]))))[:len(sizes)]
+    times = times / tables.get("timescale", 1)
+    sync = tables.get(b"stss")
+    indices = np.arange(len(sizes)) if sync is None else sync - 1
+    return [(round(float(times[i]), 3), int(offsets[i])) for i in indices if i < len(sizes)]
+
+
+def ffprobe_keyframes(path):
+    """Keyframes via ffprobe's packet flags, or None"""
+    result = subprocess.run([FFPROBE, "-v", "error", "-select_streams", "v:0", "-show_entries",
+                             "packet=pts_time,pos,flags", "-of", "csv=p=0", path],
+                            capture_output=True, text=True)
+    if result.returncode != 0:
+        return None
+    keyframes = []
+    for line in result.stdout.splitlines():
+        fields = line.split(",")
+        if len(fields) >= 3 and "K" in fields[2] and fields[1] not in ("", "N/A"):
+            keyframes.append((round(float(fields[0] or 0), 3), int(fields[1])))
+    return keyframes
+
+
+def thumbnail_strip(cap, frames, count=THUMBNAILS, height=THUMB_HEIGHT):
+    thumbs = []
+    for i in range(count):
+        cap.set(cv2.CAP_PROP_POS_FRAMES, int(i * frames / count))
+        ret, frame = cap.read()
+        if not ret:
+            break
+        h, w = frame.shape[:2]
+        thumbs.append(cv2.resize(frame, (max(1, w * height // h), height), interpolation=cv2.INTER_AREA))
+    return cv2.hconcat(thumbs) if thumbs else None
+
+
+def build_index(path):
+    cap = cv2.VideoCapture(path)
+    if not cap.isOpened():
+        raise ValueError(f"Could not open video: {path}")
+    try:
+        fps = cap.get(cv2.CAP_PROP_FPS) or 0.0
+        frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        strip = thumbnail_strip(cap, frames)
+    finally:
+        cap.release()
+    keyframes = None
+    if FFPROBE:
+        keyframes = ffprobe_keyframes(path)
+    if keyframes is None:
+        try:
+            keyframes = mp4_keyframes(path)
+        except (OSError, struct.error, ValueError, IndexError):
+            keyframes = None
+    duration = frames / fps if fps else 0.0
+    return VideoIndex(path, duration, fps, width, height, keyframes or [], strip)
+
+
+class VideoIndexer:
+    """Indexes clips on a worker thread; index(path) returns a Future"""
+
+    def __init__(self, cache_dir=CACHE_DIR):
+        self.cache_dir = cache_dir
+        self._worker = ThreadPoolExecutor(max_workers=1)
+
+    def index(self, path):
+        return self._worker.submit(self._load_or_build, path)
+
+    def _load_or_build(self, path):
+        key = cache_key(path)
+        json_path = os.path.join(self.cache_dir, key + ".json")
+        strip_path = os.path.join(self.cache_dir, key + ".jpg")
+        try:
+            with open(json_path) as f:
+                data = json.load(f)
+            data["keyframes"] = [tuple(k) for k in data["keyframes"]]
+            return VideoIndex(strip=cv2.imread(strip_path), **data)
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        index = build_index(path)
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(json_path, "w") as f:
+                json.dump(index.to_json(), f)
+            if index.strip is not None:
+                cv2.imwrite(strip_path, index.strip)
+        except OSError as e:
+            print(f"Could not cache video index: {e}")
+        return index
+
+    def shutdown(self):
+        self._worker.shutdown(wait=False)
@@ -0,0 +1,92 @@
+"""Received screenshots, decoded off the receive thread.
+
+The receiver hands over the raw bytes and goes back to accept(); a worker
+decodes a downscaled thumbnail (IMREAD_REDUCED_* lets JPEG skip most of the
+work) which the camera loop draws into its own window. The full-resolution
+image is only decoded when asked for with full().
+"""
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import cv2
+import numpy as np
+
+THUMB_WIDTH = 320
+
+
+def thumbnail(image, width=THUMB_WIDTH):
+    h, w = image.shape[:2]
+    if w <= width:
+        return image
+    return cv2.resize(image, (width, h * width // w), interpolation=cv2.INTER_AREA)
+
+
+class Viewer:
+    """Latest received image: thumbnail for the preview, full size on demand"""
+
+    def __init__(self):
+        self.thumbnail = None
+        self._data = None
+        self._full = None
+        self._lock = threading.Lock()
+        self._worker = ThreadPoolExecutor(max_workers=1)
+
+    def received(self, data):
+        """New encoded image; the thumbnail follows shortly"""
+        with self._lock:
+            self._data = bytes(data)
+            self._full = None
+        self._worker.submit(self._decode_thumbnail, self._data)
+
+    def received_image(self, image, path=None):
+        """New already-decoded image (a patched delta), saved to path on the worker.
+
+        The image must not be modified afterwards.
+        """
+        full = Future()
+        full.set_result(image)
+        with self._lock:
+            self._data = None
+            self._full = full
+        self._worker.submit(self._set_thumbnail, image)
+        if path:
+            self._worker.submit(cv2.imwrite, path, image, [cv2.IMWRITE_PNG_COMPRESSION, 1])
+
+    def full(self):
+        """Future of the full-resolution image (decoded once), or None"""
+        with self._lock:
+            if self._full is None and self._data is not None:
+                self._full = self._worker.submit(self._decode, self._data)
+            return self._full
+
+    def draw(self, frame, margin=10):
+        """Paste the thumbnail into the top-right corner of frame"""
+        thumb = self.thumbnail
+        if thumb is None:
+            return
+        h, w = thumb.shape[:2]
+        fh, fw = frame.shape[:2]
+        h, w = min(h, fh - 2 * margin), min(w, fw - 2 * margin)
+        if h <= 0 or w <= 0:
+            return
+        x = fw - w - margin
+        frame[margin:margin + h, x:x + w] = thumb[:h, :w]
+        cv2.rectangle(frame, (x - 1, margin - 1), (x + w, margin + h), (255, 255, 255), 1)
+
+    def _decode(self, data):
+        return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_COLOR)
+
+    def _decode_thumbnail(self, data):
+        # A 1/4-size decode: a 1080p+ screen still gives at least THUMB_WIDTH
+        image = cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_REDUCED_COLOR_4)
+        if image is None:
+            print("❌ Could not decode received image")
+            return
+        self._set_thumbnail(image)
+
+    def _set_thumbnail(self, image):
+        self.thumbnail = thumbnail(image)
+
+    def shutdown(self):
+        self._worker.shutdown(wait=False)
@@ -0,0 +1,47 @@
+"""Background MediaPipe loading.
+
+Importing mediapipe and building mp_hands.Hands() takes longer than opening
+the camera, so HandsLoader does both (plus one throwaway inference to warm
+the graph) on a daemon thread. The camera loop shows plain preview frames
+until get() returns the model.
+"""
+
+import threading
+import time
+
+import numpy as np
+
+
+class HandsLoader:
+    """Builds mp_hands.Hands(**options) on a background thread"""
+
+    def __init__(self, **options):
+        self.options = options
+        self.hands = None
+        self.mp_hands = None
+        self.mp_drawing = None
+        self.error = None
+        self.load_seconds = None
+        self.ready = threading.Event()
+        threading.Thread(target=self._load, daemon=True).start()
+
+    def _load(self):
+        start = time.perf_counter()
+        try:
+            import mediapipe as mp
+            self.mp_hands = mp.solutions.hands
+            self.mp_drawing = mp.solutions.drawing_utils
+            hands = self.mp_hands.Hands(**self.options)
+            hands.process(np.zeros((240, 320, 3), np.uint8))
+            self.hands = hands
+        except Exception as e:
+            self.error = e
+            print(f"Error loading hand model: {e}")
+        self.load_seconds = time.perf_counter() - start
+        self.ready.set()
+
+    def get(self, wait=False):
+        """The Hands model, or None while it is still loading"""
+        if wait:
+            self.ready.wait()
+        return self.hands